@@ -0,0 +1,343 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import linkedin_scraper
+from proxy_pool import ProxyPool
+from retry_policy import RetryPolicy
+
+# Offline benchmark for the scraper hot path. Parsing is timed directly over the
+# saved pages in fixtures/; fetching is timed end to end through async_request
+# against a local stand-in server that plays both the proxy and LinkedIn, and
+# can inject failures to exercise the retry loop. Nothing touches the network.
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FAILURES = ("429", "999", "503", "drop")
+
+
+def load_fixtures(fixtures_dir):
+    fixtures = {}
+    for name in sorted(os.listdir(fixtures_dir)):
+        if name.endswith(".html"):
+            with open(os.path.join(fixtures_dir, name), encoding="utf-8") as f:
+                fixtures[name[: -len(".html")]] = f.read()
+    return fixtures
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def summarize(latencies, items, elapsed):
+    return {
+        "items_per_sec": round(items / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+        "samples": len(latencies),
+    }
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def bench_parsing(fixtures, backends, iterations):
+    results = {}
+    for backend in backends:
+        linkedin_scraper.parser_backend = backend
+        for name, html in fixtures.items():
+            is_list = name.startswith("job_list")
+            latencies = []
+            items = 0
+            started = time.perf_counter()
+            for _ in range(iterations):
+                start = time.perf_counter()
+                try:
+                    if is_list:
+                        items += len(linkedin_scraper.parse_job_list_page(html))
+                    else:
+                        linkedin_scraper.parse_job_details_page(html)
+                        items += 1
+                except AttributeError:
+                    pass
+                latencies.append(time.perf_counter() - start)
+            results[f"{backend}/{name}"] = summarize(
+                latencies, items, time.perf_counter() - started
+            )
+    return results
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, fixtures, failure_rate, seed):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.job_list = fixtures["job_list"]
+        self.job_details = fixtures["job_details"]
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.failures = 0
+
+    @property
+    def address(self):
+        return f"127.0.0.1:{self.server_address[1]}"
+
+    def draw_failure(self):
+        with self.lock:
+            self.hits += 1
+            if self.random.random() < self.failure_rate:
+                self.failures += 1
+                return self.random.choice(FAILURES)
+        return None
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, delayed ACKs
+    # add ~40ms to every response
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        # Requests arrive in proxy form ("GET http://host/path"), so only the
+        # path and query matter
+        url = urlsplit(self.path)
+        if url.path in ("", "/"):
+            return self.reply(200, "ok")
+
+        failure = self.server.draw_failure()
+        if failure == "drop":
+            self.close_connection = True
+            return
+        if failure is not None:
+            return self.reply(int(failure), "")
+
+        if url.path.endswith("/seeMoreJobPostings/search"):
+            start = parse_qs(url.query).get("start", ["0"])[0]
+            # Offset the ids so every page holds distinct jobs
+            body = self.server.job_list.replace(
+                "urn:li:jobPosting:", f"urn:li:jobPosting:{start}"
+            )
+            return self.reply(200, body)
+        if "/jobPosting/" in url.path:
+            return self.reply(200, self.server.job_details)
+        return self.reply(404, "")
+
+    def reply(self, status, body):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInProxySource:
+    # Takes the place of FreeProxy so the pool only ever offers the server
+    def __init__(self, address):
+        self.address = address
+
+    def get_proxy_list(self, repeat):
+        return [self.address]
+
+
+def point_scraper_at(server):
+    origin = f"http://{server.address}"
+    linkedin_scraper.JOB_LIST_URL = (
+        f"{origin}/jobs-guest/jobs/api/seeMoreJobPostings/search?"
+    )
+    linkedin_scraper.JOB_DETAILS_URL = f"{origin}/jobs-guest/jobs/api/jobPosting/{{}}"
+    linkedin_scraper.proxies = ProxyPool(
+        StandInProxySource(server.address),
+        min_size=1,
+        validate_url=f"{origin}/",
+        max_consecutive_failures=1000,
+        min_success_rate=0,
+    )
+    linkedin_scraper.cache = None
+    # Keep the one-off profile generation out of the latency samples
+    linkedin_scraper.get_profiles()
+
+
+async def bench_fetching(server, requests, pages, concurrency):
+    job_ids = [str(4012345678 + i) for i in range(requests)]
+    urls = [linkedin_scraper.JOB_DETAILS_URL.format(job_id) for job_id in job_ids]
+    hits_before, failures_before = server.hits, server.failures
+
+    async with linkedin_scraper.open_sessions() as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        failed = 0
+
+        async def timed(indx, url):
+            nonlocal failed
+            async with semaphore:
+                start = time.perf_counter()
+                response = await linkedin_scraper.async_request(client, url, indx)
+                latencies.append(time.perf_counter() - start)
+                if isinstance(response, str):
+                    failed += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(timed(indx, url) for indx, url in enumerate(urls)))
+        requests_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        job_list = await linkedin_scraper.fetch_job_list(
+            client, keywords="python", pages=pages, concurrency=concurrency
+        )
+        crawl_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        details = await linkedin_scraper.fetch_job_details_batch(
+            client, [job.id for job in job_list], concurrency
+        )
+        details_elapsed = time.perf_counter() - started
+
+    hits = server.hits - hits_before
+    attempts_needed = requests + pages + len(job_list)
+    return {
+        "async_request": {**summarize(latencies, requests, requests_elapsed), "failed": failed},
+        "list_crawl": {
+            "pages": pages,
+            "jobs": len(job_list),
+            "jobs_per_sec": round(len(job_list) / crawl_elapsed, 1),
+            "elapsed_ms": round(crawl_elapsed * 1000, 1),
+        },
+        "details_batch": {
+            "jobs": len(details),
+            "errors": sum(1 for result in details if "error" in result),
+            "jobs_per_sec": round(len(details) / details_elapsed, 1),
+            "elapsed_ms": round(details_elapsed * 1000, 1),
+        },
+        "retries": {
+            "server_hits": hits,
+            "injected_failures": server.failures - failures_before,
+            "retries": hits - attempts_needed,
+        },
+    }
+
+
+def run_fetch_benchmark(fixtures, failure_rate, seed, requests, pages, concurrency):
+    server = StandInServer(fixtures, failure_rate, seed)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        point_scraper_at(server)
+        return asyncio.run(bench_fetching(server, requests, pages, concurrency))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--fixtures",
+        type=str,
+        default=FIXTURES_DIR,
+        help="Directory of saved LinkedIn pages",
+    )
+    parser.add_argument(
+        "--parser",
+        type=str,
+        choices=["bs4", "lxml", "both"],
+        default="both",
+        help="Parsing backend(s) to benchmark",
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=200,
+        help="Times each fixture is parsed",
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=100,
+        help="Job postings fetched through async_request",
+    )
+    parser.add_argument(
+        "--pages",
+        type=int,
+        default=8,
+        help="List pages crawled end to end",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=linkedin_scraper.DEFAULT_CONCURRENCY,
+        help="Maximum concurrent fetches",
+    )
+    parser.add_argument(
+        "--failure_rate",
+        type=float,
+        default=0.2,
+        help="Fraction of stand-in responses replaced by an injected failure",
+    )
+    parser.add_argument(
+        "--backoff_base",
+        type=float,
+        default=0.5,
+        help="Retry backoff base in seconds, as in linkedin_scraper",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed for failure injection",
+    )
+    parser.add_argument(
+        "--skip_fetch",
+        action="store_true",
+        help="Only benchmark parsing",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Also write the JSON report to this file",
+    )
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    backends = ["bs4", "lxml"] if args.parser == "both" else [args.parser]
+
+    report = {"parsing": bench_parsing(fixtures, backends, args.iterations)}
+    if not args.skip_fetch:
+        linkedin_scraper.parser_backend = backends[-1]
+        linkedin_scraper.retry_policy = RetryPolicy(base_delay=args.backoff_base)
+        report["fetching"] = run_fetch_benchmark(
+            fixtures,
+            args.failure_rate,
+            args.seed,
+            args.requests,
+            args.pages,
+            args.concurrency,
+        )
+    report["peak_rss_mb"] = peak_rss_mb()
+
+    print(json.dumps(report, indent=4))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Cold-start benchmark for the scripts the services run as subprocesses. Each
+# module is imported in a fresh interpreter under `python -X importtime`, and
+# its cumulative import time is checked against a budget; the run fails when
+# any module goes over, listing the imports that cost the most. Heavy
+# dependencies belong behind first use, not at module level.
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Milliseconds of cumulative import time allowed per module, with headroom over
+# what a warm disk cache measures
+BUDGETS_MS = {
+    "linkedin_scraper": 150,
+    "docx_replace": 100,
+    "docx_read": 80,
+    # Loads docx2python up front on purpose, to warm its pool processes
+    "docx_worker": 250,
+}
+
+
+def import_times(code):
+    """Return {imported module: (self us, cumulative us)} for running :code: in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SCRIPTS_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:") :].split("|")
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            # the header line
+            continue
+        times[fields[2].strip()] = (self_us, cumulative_us)
+    return times
+
+
+def wall_time(args):
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, *args], cwd=SCRIPTS_DIR, capture_output=True, check=True
+    )
+    return time.perf_counter() - start
+
+
+def bench_module(module, runs, top, startup):
+    samples = []
+    for _ in range(runs):
+        times = import_times(f"import {module}")
+        samples.append(times[module][1] / 1000)
+    # Breakdown from the last run, leaving out what the interpreter loads anyway
+    heaviest = sorted(
+        (
+            (name, cumulative)
+            for name, (_, cumulative) in times.items()
+            if name != module and name not in startup
+        ),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:top]
+    help_samples = [wall_time([f"{module}.py", "--help"]) for _ in range(runs)]
+    return {
+        "import_ms": round(statistics.median(samples), 1),
+        "import_min_ms": round(min(samples), 1),
+        "budget_ms": BUDGETS_MS.get(module),
+        "help_wall_ms": round(statistics.median(help_samples) * 1000, 1),
+        "heaviest_imports_ms": {name: round(us / 1000, 1) for name, us in heaviest},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "modules",
+        nargs="*",
+        default=list(BUDGETS_MS),
+        help="Modules to benchmark (default: every budgeted module)",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=5,
+        help="Fresh interpreters per module; the median is checked",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=8,
+        help="Heaviest imports listed per module",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Also write the JSON report to this file",
+    )
+    args = parser.parse_args()
+
+    startup = import_times("pass")
+    report = {
+        module: bench_module(module, args.runs, args.top, startup)
+        for module in args.modules
+    }
+    text = json.dumps(report, indent=4)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    over = [
+        module
+        for module, result in report.items()
+        if result["budget_ms"] is not None and result["import_ms"] > result["budget_ms"]
+    ]
+    for module in over:
+        print(
+            f"{module}: {report[module]['import_ms']}ms import, "
+            f"budget {report[module]['budget_ms']}ms",
+            file=sys.stderr,
+        )
+    sys.exit(1 if over else 0)
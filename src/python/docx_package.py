@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import copy
+import zipfile
+
+from lxml import etree
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+# Run content that stands for a character of the paragraph text, by local name.
+# Only inside a w:r: w:tab also defines tab stops in paragraph properties,
+# which are not text.
+SEPARATORS = {"tab": "\t", "br": "\n", "cr": "\n"}
+
+CONTENT_TYPES = "[Content_Types].xml"
+CT_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+# Parts holding document text, in the order docx2python reads them: headers,
+# the main document (any flavour), footers, footnotes and endnotes
+TEXT_PART_SUFFIXES = (
+    ".header+xml",
+    ".main+xml",
+    ".footer+xml",
+    ".footnotes+xml",
+    ".endnotes+xml",
+)
+
+
+def text_part_names(zin: zipfile.ZipFile) -> list[str]:
+    """Return the names of the members of a docx that hold w:t text, in reading order.
+
+    :param zin: an open docx package
+    """
+    root = etree.fromstring(zin.read(CONTENT_TYPES))
+    parts = []
+    for override in root.iter(f"{{{CT_NS}}}Override"):
+        content_type = override.get("ContentType", "")
+        if "wordprocessingml" not in content_type:
+            continue
+        for rank, suffix in enumerate(TEXT_PART_SUFFIXES):
+            if content_type.endswith(suffix):
+                parts.append((rank, override.get("PartName", "").lstrip("/")))
+    return [name for _, name in sorted(parts)]
+
+
+def member_ends(zin: zipfile.ZipFile) -> dict[str, int]:
+    """Return the offset where the bytes of each member of :zin: end.
+
+    A member runs from its local header to the next member's header (or the
+    central directory), which takes in any data descriptor after its data.
+    """
+    ordered = sorted(zin.infolist(), key=lambda info: info.header_offset)
+    ends = [info.header_offset for info in ordered[1:]] + [zin.start_dir]
+    return {info.filename: end for info, end in zip(ordered, ends)}
+
+
+def copy_raw(
+    zin: zipfile.ZipFile, zout: zipfile.ZipFile, info: zipfile.ZipInfo, end: int
+) -> None:
+    """Copy a member of :zin: into :zout: as stored, without recompressing it.
+
+    :param zin: archive open for reading
+    :param zout: archive open for writing
+    :param info: the member to copy
+    :param end: where the member ends in :zin:, from member_ends
+    """
+    zin.fp.seek(info.header_offset)
+    data = zin.fp.read(end - info.header_offset)
+
+    new_info = copy.copy(info)
+    new_info.header_offset = zout.fp.tell()
+    zout.fp.write(data)
+    zout.filelist.append(new_info)
+    zout.NameToInfo[info.filename] = new_info
+    # where the central directory goes, or the next member written
+    zout.start_dir = zout.fp.tell()
+
+
+def write_part(zout: zipfile.ZipFile, info: zipfile.ZipInfo, data: bytes) -> None:
+    """Write :data: as a new member named and compressed like :info:."""
+    new_info = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    new_info.compress_type = info.compress_type
+    new_info.external_attr = info.external_attr
+    zout.writestr(new_info, data)
+
+
+def serialize_part(tree: etree._ElementTree, standalone: bool | None = None) -> bytes:
+    """Serialize a part with its XML declaration.
+
+    :param standalone: the declaration's standalone flag, for a tree that no
+        longer carries it (a copy or an unpickled tree); defaults to the tree's own
+    """
+    return etree.tostring(
+        tree,
+        xml_declaration=True,
+        encoding="UTF-8",
+        standalone=standalone if standalone is not None else tree.docinfo.standalone,
+    )
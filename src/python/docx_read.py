@@ -1,7 +1,120 @@
-from docx2python import docx2python
+from docx_package import SEPARATORS, W_NS, text_part_names
+from io import BytesIO
+from lxml import etree
+import argparse
+import hashlib
 import sys
+import time
+import zipfile
 
-sys.stdout.reconfigure(encoding="utf-8")
-sys.stderr.reconfigure(encoding="utf-8")
-with docx2python(sys.argv[1], duplicate_merged_cells=False) as docx_content:
-    print(docx_content.text)
+
+def read_docx_text(source):
+    """Return the text of a docx given as a path, a binary file-like object or bytes."""
+    from docx2python import docx2python
+
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+    with docx2python(source, duplicate_merged_cells=False) as docx_content:
+        return docx_content.text
+
+
+def iter_part_paragraphs(part):
+    """Yield the text of each paragraph in a docx part, streaming its xml.
+
+    Elements are cleared as soon as their paragraph is read, so memory stays
+    flat however long the document is. A paragraph nested in another (a text
+    box) is yielded before the paragraph around it.
+    """
+    paragraph = f"{{{W_NS}}}p"
+    text = f"{{{W_NS}}}t"
+    run = f"{{{W_NS}}}r"
+    separators = {f"{{{W_NS}}}{name}": char for name, char in SEPARATORS.items()}
+    tags = (paragraph, text, *separators)
+    stack = []
+    for event, elem in etree.iterparse(part, events=("start", "end"), tag=tags):
+        if elem.tag == paragraph:
+            if event == "start":
+                stack.append([])
+                continue
+            yield "".join(stack.pop())
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        elif event == "end" and stack:
+            if elem.tag == text:
+                stack[-1].append(elem.text or "")
+            # Separators count only inside a run, see SEPARATORS
+            elif elem.getparent().tag == run:
+                stack[-1].append(separators[elem.tag])
+
+
+def iter_docx_paragraphs(source):
+    """Yield the paragraph text of each text part of a docx, in reading order.
+
+    :param source: path or seekable binary file-like object
+    """
+    with zipfile.ZipFile(source) as zin:
+        for name in text_part_names(zin):
+            with zin.open(name) as part:
+                yield from iter_part_paragraphs(part)
+
+
+def read_docx_text_fast(source):
+    """Return the paragraphs of a docx joined the way docx2python's .text joins them."""
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+    return "\n\n".join(iter_docx_paragraphs(source))
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding="utf-8")
+    sys.stderr.reconfigure(encoding="utf-8")
+    parser = argparse.ArgumentParser()
+    parser.add_argument("file", type=str, help="Path to the docx, or - for stdin")
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Stream paragraph text with lxml instead of loading docx2python",
+    )
+    parser.add_argument(
+        "--cache_db",
+        type=str,
+        default=None,
+        help="SQLite file caching extracted text by the docx's content hash",
+    )
+    parser.add_argument(
+        "--cache_size",
+        type=int,
+        default=1000,
+        help="Maximum number of cached documents",
+    )
+    args = parser.parse_args()
+
+    if args.file == "-":
+        data = sys.stdin.buffer.read()
+    else:
+        with open(args.file, "rb") as f:
+            data = f.read()
+
+    if args.cache_db is None:
+        if not args.fast:
+            print(read_docx_text(data))
+        else:
+            # write paragraphs as they are read rather than holding the text
+            for indx, text in enumerate(iter_docx_paragraphs(BytesIO(data))):
+                sys.stdout.write(f"\n\n{text}" if indx else text)
+            sys.stdout.write("\n")
+    else:
+        from response_cache import SqliteCache
+
+        cache = SqliteCache(args.cache_db, args.cache_size)
+        mode = "fast" if args.fast else "docx2python"
+        key = f"{mode}:{hashlib.sha256(data).hexdigest()}"
+        entry = cache.get(key)
+        if entry is not None:
+            text = entry[0]
+        else:
+            text = read_docx_text_fast(data) if args.fast else read_docx_text(data)
+            cache.set(key, text, time.time())
+        cache.close()
+        print(text)
@@ -1,22 +1,45 @@
 from __future__ import annotations
 
-import sys
+import argparse
 import json
 import copy
-import re
-from typing import TYPE_CHECKING, Iterator
+import hashlib
+import io
+import os
+import pickle
+import sys
+import tempfile
+import time
+import zipfile
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from itertools import accumulate
+from typing import TYPE_CHECKING, ContextManager, Iterator
 
 from lxml import etree
 
-from docx2python.iterators import iter_at_depth
-from docx2python.main import docx2python
+from docx_package import (
+    SEPARATORS,
+    W_NS,
+    copy_raw,
+    member_ends,
+    serialize_part,
+    text_part_names,
+    write_part,
+)
+
+from text_matcher import Automaton, normalize_pattern, normalize_with_offsets
 
 if TYPE_CHECKING:
 
-    import os
+    from typing import IO, Union
 
     from lxml.etree import _Element as EtreeElement  # type: ignore
 
+    # a path, or a binary file-like object such as io.BytesIO or stdin
+    DocxFile = Union[str, os.PathLike[str], IO[bytes]]
+
 
 def _copy_new_text(elem: EtreeElement, new_text: str) -> EtreeElement:
     """Copy a text element and replace text.
@@ -40,141 +63,649 @@ def _new_br_element(elem: EtreeElement) -> EtreeElement:
     return etree.Element(f"{{{prefix}}}br")
 
 
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+
+def _set_text(elem: EtreeElement, text: str) -> None:
+    """Set the text of a w:t element, keeping leading and trailing spaces."""
+    elem.text = text
+    if text != text.strip():
+        elem.set(XML_SPACE, "preserve")
+
+
+class ParagraphIndex:
+    def __init__(self, elems: list[EtreeElement], w: str) -> None:
+        """Map offsets in the joined text of a paragraph to the elements holding them.
+
+        :param elems: the paragraph's w:t, w:tab and w:br elements, in document order
+        :param w: the wordprocessingml namespace
+
+        Tabs and breaks count as one character each ("\\t", "\\n") so text on
+        either side of them can match as one sentence. They are never edited,
+        only removed when a replacement covers them.
+        """
+        self.elems = elems
+        self.is_text = [elem.tag == f"{{{w}}}t" for elem in elems]
+        texts = [
+            (elem.text or "") if is_text else SEPARATORS[etree.QName(elem).localname]
+            for elem, is_text in zip(elems, self.is_text)
+        ]
+        self.starts = list(accumulate(map(len, texts), initial=0))
+        self.text = "".join(texts)
+
+    def locate(self, offset: int) -> tuple[int, int]:
+        """Return (element index, offset in element) of character :offset:."""
+        # empty w:t share their start with the next element; take the last one
+        index = bisect_right(self.starts, offset, hi=len(self.elems)) - 1
+        return index, offset - self.starts[index]
+
+    def replace(self, start: int, end: int, new_text: str) -> None:
+        """Replace characters start:end of the paragraph text with :new_text:.
+
+        Only the elements the span covers are touched. The replacement goes into
+        the first w:t of the span, so it keeps that run's formatting; the rest of
+        the span is cut from the elements it covers. Will use softbreaks <br> to
+        preserve line breaks in replacement text.
+
+        Edits must be made back to front: offsets are not updated after an edit.
+        """
+        first, first_offset = self.locate(start)
+        last, last_offset = self.locate(end - 1)
+        target = next(i for i in range(first, last + 1) if self.is_text[i])
+
+        for i in range(first, last + 1):
+            elem = self.elems[i]
+            if not self.is_text[i]:
+                elem.getparent().remove(elem)
+                continue
+            text = elem.text or ""
+            head = text[:first_offset] if i == first else ""
+            tail = text[last_offset + 1 :] if i == last else ""
+            if i != target:
+                _set_text(elem, head + tail)
+                continue
+
+            lines = new_text.splitlines() or [""]
+            lines[-1] += tail
+            _set_text(elem, head + lines[0])
+            if len(lines) == 1:
+                continue
+
+            # insert the remaining lines after a break each
+            parent = elem.getparent()
+            index = parent.index(elem)
+            new_elems = []
+            for line in lines[1:]:
+                new_elems.append(_new_br_element(elem))
+                new_elems.append(_copy_new_text(elem, line))
+            parent[index + 1 : index + 1] = new_elems
+            for new_elem in new_elems[1::2]:
+                _set_text(new_elem, new_elem.text)
+
+
+def _iter_paragraphs(root: EtreeElement, w: str) -> Iterator[ParagraphIndex]:
+    """Yield an index of each paragraph under :root:, in document order.
+
+    :param root: an etree element presumably containing descendant paragraphs
+    :param w: the wordprocessingml namespace
+    Elements belong to their nearest w:p ancestor, so text boxes nested in a
+    paragraph are kept apart from the paragraph around them.
+    """
+    run = f"{{{w}}}r"
+    paragraphs: dict[EtreeElement | None, list[EtreeElement]] = {}
+    for elem in root.iter(f"{{{w}}}t", *(f"{{{w}}}{name}" for name in SEPARATORS)):
+        # Separators count only inside a run, see SEPARATORS
+        if elem.getparent().tag != run:
+            continue
+        paragraph = next(elem.iterancestors(f"{{{w}}}p"), None)
+        paragraphs.setdefault(paragraph, []).append(elem)
+    for elems in paragraphs.values():
+        yield ParagraphIndex(elems, w)
+
+
+PHASES = ("open", "parse", "match", "serialize")
+
+
+class Report:
+    def __init__(self, debug: int = 0) -> None:
+        """Diagnostics for one replacement run.
+
+        :param debug: 1 logs each replacement to stderr, 2 also each paragraph
+            scanned
+
+        Records where and how each old text matched and the time spent in each
+        phase: opening the package, parsing parts, matching and editing, and
+        serializing the output.
+        """
+        self.debug = debug
+        self.timings = dict.fromkeys(PHASES, 0.0)
+        self.matched: list[dict] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - start
+
+    def scanned(self, where: tuple[str | None, int], text: str) -> None:
+        if self.debug >= 2:
+            print(f"Scanning {where[0]} paragraph {where[1]}: {text!r}", file=sys.stderr)
+
+    def match(self, old: str, where: tuple[str | None, int], how: str) -> None:
+        """:param how: full, start, end or partial: which part of the paragraph it covered"""
+        part, paragraph = where
+        self.matched.append(
+            {"originalText": old, "part": part, "paragraph": paragraph, "how": how}
+        )
+        if self.debug >= 1:
+            print(f"Matched {how} in {part} paragraph {paragraph}: {old!r}", file=sys.stderr)
+
+    def to_dict(self, replacer: Replacer) -> dict:
+        return {
+            "matched": self.matched,
+            "unmatched": replacer.unmatched(),
+            "timings_ms": {
+                name: round(seconds * 1000, 3) for name, seconds in self.timings.items()
+            },
+        }
+
+
+def _phase(report: Report | None, name: str) -> ContextManager:
+    return report.phase(name) if report is not None else nullcontext()
+
+
 class Replacer:
     def __init__(
         self,
         *replacements: tuple[str, str],
+        report: Report | None = None,
     ) -> None:
-        """Replace :old: with :new: in all descendants of :root:.
+        """Replace each old text with its new text wherever it occurs.
 
-        :param root: an etree element presumably containing descendant text elements
-        :param old: text to be replaced
-        :param new: replacement text
+        :param replacements: tuples of strings (old, new)
+        :param report: collects where each old text matched and phase timings
 
-        Will use softbreaks <br> to preserve line breaks in replacement text.
+        All old texts are compiled into one Aho-Corasick automaton over their
+        normalized form (collapsed whitespace, optional trailing full stop), so
+        every paragraph is scanned once and replacements may appear in any order.
+        Matches may span several runs of a paragraph, and tabs or breaks in it.
         """
         self.replacements = replacements
-        self.replaceIndex = 0
-        self.old, self.new = replacements[self.replaceIndex]
-        self.builder = ""
-        self.updated_text = []
-        self.update = False
-
-    def get_next_replacement(self):
-        self.builder = ""
-        self.replaceIndex = self.replaceIndex + 1
-        self.old, self.new = (
-            self.replacements[self.replaceIndex]
-            if self.replaceIndex < len(self.replacements)
-            else ("", "")
+        self.automaton = Automaton(normalize_pattern(old) for old, _ in replacements)
+        self.matches = [0] * len(replacements)
+        self.report = report
+
+    def replace_text(self, root: EtreeElement, part: str | None = None) -> int:
+        """Replace every occurrence of an old text in the paragraphs under :root:.
+
+        :param root: an etree element presumably containing descendant text elements
+        :param part: name of the package part :root: came from, for the report
+        :return: number of replacements made
+        """
+        w = root.nsmap.get("w", W_NS)
+        return sum(
+            self.replace_paragraph(paragraph, (part, number))
+            for number, paragraph in enumerate(_iter_paragraphs(root, w))
         )
-        print()
-        print(f"Looking for: {self.old}")
 
-    def recursive_text_replace(self, branch: EtreeElement):
-        """Replace any text element contining old with one or more elements.
+    def replace_paragraph(
+        self, paragraph: ParagraphIndex, where: tuple[str | None, int]
+    ) -> int:
+        text, offsets = normalize_with_offsets(paragraph.text)
+        if self.report is not None:
+            self.report.scanned(where, text)
+        matches = self.automaton.find_all(text)
+        self.apply(paragraph, offsets, matches, where)
+        return len(matches)
+
+    def apply(
+        self,
+        paragraph: ParagraphIndex,
+        offsets: list[int],
+        matches: list[tuple[int, int, int]],
+        where: tuple[str | None, int],
+    ) -> None:
+        """Make the edits for :matches: found in the normalized paragraph text.
 
-        :param branch: an etree element
+        :param offsets: raw offset of each normalized character
+        :param matches: (start, end, replacement index) from Automaton.find_all
+        :param where: (part name, paragraph number), for the report
         """
-        for elem in tuple(branch):
-            if elem.text and elem.text.strip():
-                splits = re.split(
-                    r"(?<!\b\w\.\w\.)(?<!\b[A-Z][a-z]\.)(?<=[.!?]) +", elem.text
+        raw = paragraph.text
+        # edit back to front so earlier offsets stay valid
+        for start, end, index in reversed(matches):
+            new_text = self.replacements[index][1]
+            raw_start, raw_end = offsets[start], offsets[end - 1] + 1
+            # the full stop is optional in the old text; don't leave it doubled
+            if raw[raw_end : raw_end + 1] == "." and new_text.rstrip().endswith("."):
+                raw_end += 1
+            if self.report is not None:
+                at_start = not raw[:raw_start].strip()
+                at_end = raw[raw_end:].strip() in ("", ".")
+                how = (
+                    "full" if at_start and at_end
+                    else "start" if at_start
+                    else "end" if at_end
+                    else "partial"
                 )
-                print(elem.text)
-                for split in splits:
-                    concat = self.builder.strip() + " " + split
-                    concat = re.sub(r"\s+([.,!?;:-])", r"\1", concat)
-                    if self.old.startswith(concat.lstrip()):
-                        self.update = True
-                        self.builder = concat.lstrip()
-                        print()
-                        print(f"builder: {self.builder}")
-                        if split.rstrip(".") == self.old.rstrip("."):
-                            self.updated_text.append(self.new)
-                            print(f"full match: {split} {self.updated_text}")
-
-                        elif len(splits) > 1:
-                            if split == splits[-1]:
-                                self.updated_text.append(self.new)
-                                print(f"end match: {split} {self.updated_text}")
-
-                            elif split == splits[0]:
-                                self.updated_text = [""]
-                                print(f"start match: {split} {self.updated_text}")
-                        else:
-                            self.updated_text = (
-                                [self.new]
-                                if self.old.startswith(split.lstrip())
-                                else [""]
-                            )
-                            print(f"partial match: {split} {self.updated_text}")
-
-                        if self.builder.rstrip(".") == self.old.rstrip("."):
-                            self.get_next_replacement()
-                    else:
-                        self.updated_text.append(split)
+                self.report.match(self.replacements[index][0], where, how)
+            paragraph.replace(raw_start, raw_end, new_text)
+            self.matches[index] += 1
 
-            if not elem.text or self.update == False:
-                self.updated_text = []
-                self.recursive_text_replace(elem)
-                continue
+    def unmatched(self) -> list[str]:
+        return [old for (old, _), n in zip(self.replacements, self.matches) if not n]
 
-            # create a new text element for each line in replacement text
-            # text = elem.text.replace(self.old, self.new)
 
-            new_elems = [
-                _copy_new_text(elem, line)
-                for line in " ".join(self.updated_text).splitlines()
-            ]
+def _replace_package_text(
+    path_in: DocxFile,
+    path_out: DocxFile,
+    replacer: Replacer,
+) -> None:
+    """Apply :replacer: to the text parts of a docx, copying everything else raw.
 
-            # insert breakpoints where line breaks were
-            breaks = [_new_br_element(elem) for _ in new_elems]
-            new_elems = [x for pair in zip(new_elems, breaks) for x in pair][:-1]
+    Only the document, headers, footers, footnotes and endnotes are parsed.
+    Other members, and text parts without a match, are copied as stored.
+    """
+    report = replacer.report
+    with _phase(report, "open"):
+        zin = zipfile.ZipFile(path_in)
+        text_parts = set(text_part_names(zin))
+        ends = member_ends(zin)
+    with zin, zipfile.ZipFile(path_out, "w") as zout:
+        for info in zin.infolist():
+            if info.filename in text_parts:
+                with _phase(report, "parse"):
+                    tree = etree.ElementTree(etree.fromstring(zin.read(info)))
+                with _phase(report, "match"):
+                    replaced = replacer.replace_text(tree.getroot(), info.filename)
+                if replaced:
+                    with _phase(report, "serialize"):
+                        write_part(zout, info, serialize_part(tree))
+                    continue
+            with _phase(report, "serialize"):
+                copy_raw(zin, zout, info, ends[info.filename])
+
+
+class TemplatePart:
+    __slots__ = ("tree", "standalone", "paragraphs", "text", "starts")
+
+    def __init__(self, xml: bytes) -> None:
+        """A parsed text part with the normalized text of its paragraphs.
+
+        :param xml: contents of the part
+        """
+        self.tree = etree.parse(io.BytesIO(xml))
+        # Copies and pickles of the tree lose the declaration's standalone flag
+        self.standalone = self.tree.docinfo.standalone
+        root = self.tree.getroot()
+        w = root.nsmap.get("w", W_NS)
+        # paragraphs are found again in a copy of the tree by element position
+        positions = {elem: i for i, elem in enumerate(root.iter())}
+        self.paragraphs: list[tuple[int, list[int], str, list[int]]] = []
+        for number, paragraph in enumerate(_iter_paragraphs(root, w)):
+            text, offsets = normalize_with_offsets(paragraph.text)
+            if text:
+                elems = [positions[elem] for elem in paragraph.elems]
+                self.paragraphs.append((number, elems, text, offsets))
+        self._join()
+
+    def _join(self) -> None:
+        # all paragraph texts in one string, so finding which paragraphs hold an
+        # old text is a str.find per old text rather than a scan per paragraph
+        self.text = "\0".join(text for _, _, text, _ in self.paragraphs)
+        lengths = [len(text) + 1 for _, _, text, _ in self.paragraphs]
+        self.starts = list(accumulate(lengths, initial=0))
+
+    def __getstate__(self) -> tuple[bytes, bool | None, list]:
+        return etree.tostring(self.tree), self.standalone, self.paragraphs
+
+    def __setstate__(self, state: tuple[bytes, bool | None, list]) -> None:
+        xml, self.standalone, self.paragraphs = state
+        self.tree = etree.ElementTree(etree.fromstring(xml))
+        self._join()
+
+    def candidates(self, patterns: list[str]) -> list[int]:
+        """Return the indices of the paragraphs containing any of :patterns:."""
+        found = set()
+        for pattern in patterns:
+            if not pattern:
+                continue
+            position = self.text.find(pattern)
+            while position != -1:
+                found.add(bisect_right(self.starts, position) - 1)
+                position = self.text.find(pattern, position + 1)
+        return sorted(found)
 
-            # replace the original element with the new elements
-            parent = elem.getparent()
-            if parent is not None:
-                index = parent.index(elem)
-                if len(new_elems) > 0:
-                    parent[index : index + 1] = new_elems
-                else:
-                    parent.remove(elem)
+    def render(self, replacer: Replacer, name: str) -> bytes | None:
+        """Return the part with :replacer: applied, or None if nothing matched.
 
-            self.update = False
-            self.updated_text = []
+        :param name: name of the part in the package, for the report
+        """
+        report = replacer.report
+        with _phase(report, "match"):
+            hits = []
+            for indx in self.candidates(replacer.automaton.patterns):
+                number, elems, text, offsets = self.paragraphs[indx]
+                # the automaton settles overlapping matches and drops
+                # substring hits inside a longer word, which find misses
+                matches = replacer.automaton.find_all(text)
+                if matches:
+                    hits.append((number, elems, offsets, matches))
+        if not hits:
+            return None
+
+        with _phase(report, "parse"):
+            tree = copy.deepcopy(self.tree)
+            root = tree.getroot()
+            all_elems = list(root.iter())
+        with _phase(report, "match"):
+            w = root.nsmap.get("w", W_NS)
+            for number, elems, offsets, matches in hits:
+                paragraph = ParagraphIndex([all_elems[i] for i in elems], w)
+                replacer.apply(paragraph, offsets, matches, (name, number))
+        with _phase(report, "serialize"):
+            return serialize_part(tree, self.standalone)
+
+
+class Template:
+    def __init__(self, data: bytes) -> None:
+        """A docx compiled once and rendered with any number of replacement sets.
+
+        :param data: contents of the docx
+
+        Compiling parses the text parts and normalizes every paragraph. Rendering
+        only scans the normalized text, then edits a copy of the parts that match.
+        """
+        self.data = data
+        with zipfile.ZipFile(io.BytesIO(data)) as zin:
+            self.parts = {
+                name: TemplatePart(zin.read(name)) for name in text_part_names(zin)
+            }
+
+    def render(
+        self,
+        path_out: DocxFile,
+        *replacements: tuple[str, str],
+        report: Report | None = None,
+    ) -> Replacer:
+        """Write the docx with :replacements: applied to :path_out:.
+
+        :param report: collects where each old text matched and phase timings
+        :return: the Replacer used, for its match counts
+        """
+        replacer = Replacer(*replacements, report=report)
+        with _phase(report, "open"):
+            zin = zipfile.ZipFile(io.BytesIO(self.data))
+            ends = member_ends(zin)
+        with zin, zipfile.ZipFile(path_out, "w") as zout:
+            for info in zin.infolist():
+                part = self.parts.get(info.filename)
+                xml = part.render(replacer, info.filename) if part is not None else None
+                with _phase(report, "serialize"):
+                    if xml is not None:
+                        write_part(zout, info, xml)
+                    else:
+                        copy_raw(zin, zout, info, ends[info.filename])
+        return replacer
+
+
+MAX_TEMPLATES = 8
+# Part of every cached template's file name; bump it whenever TemplatePart or
+# Template change what they pickle, so stale files are never loaded
+TEMPLATE_VERSION = 2
+templates: OrderedDict[str, Template] = OrderedDict()
+
+
+def _load_template(path: str) -> Template | None:
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        # Compiled again and overwritten, like a missing file
+        print(f"Ignoring unreadable template cache {path}: {e}", file=sys.stderr)
+        return None
+
+
+def _save_template(template: Template, cache_dir: str, path: str) -> None:
+    os.makedirs(cache_dir, exist_ok=True)
+    # A temp file of its own per process, so concurrent runs compiling the
+    # same docx never write into one file; os.replace publishes it whole
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(template, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def compile_template(data: bytes, cache_dir: str | None = None) -> Template:
+    """Return the template for a docx, compiling it only once per content hash.
+
+    :param data: contents of the docx
+    :param cache_dir: directory keeping compiled templates between processes.
+        Templates are stored with pickle, which can run code on load, so the
+        directory must be writable only by trusted processes
+    """
+    key = hashlib.sha256(data).hexdigest()
+    template = templates.get(key)
+    if template is not None:
+        templates.move_to_end(key)
+        return template
+
+    name = f"{key}.v{TEMPLATE_VERSION}.template"
+    path = os.path.join(cache_dir, name) if cache_dir else None
+    template = _load_template(path) if path else None
+    if template is None:
+        template = Template(data)
+        if path:
+            _save_template(template, cache_dir, path)
+
+    templates[key] = template
+    while len(templates) > MAX_TEMPLATES:
+        templates.popitem(last=False)
+    return template
+
+
+def read_docx_bytes(source: DocxFile | bytes) -> bytes:
+    """Return the contents of :source:, a path, a binary file-like object or bytes."""
+    if isinstance(source, bytes):
+        return source
+    if hasattr(source, "read"):
+        return source.read()
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def render_batch(
+    path_in: DocxFile | bytes,
+    jobs: list[tuple[DocxFile, list[tuple[str, str]]]],
+    cache_dir: str | None = None,
+    report: bool = False,
+    debug: int = 0,
+) -> list[Replacer]:
+    """Render several replacement sets from one compiled docx.
+
+    :param path_in: input docx, as a path, file-like object or bytes
+    :param jobs: (path_out, replacements) for each document to write
+    :param cache_dir: trusted directory keeping compiled templates between
+        processes, see compile_template
+    :param report: give each job's Replacer a Report
+    :param debug: debug level of those reports
+    :return: the Replacer used for each job
+    """
+    template = compile_template(read_docx_bytes(path_in), cache_dir)
+    return [
+        template.render(
+            path_out, *replacements, report=Report(debug) if report else None
+        )
+        for path_out, replacements in jobs
+    ]
 
 
 def replace_docx_text(
-    path_in: str | os.PathLike[str],
-    path_out: str | os.PathLike[str],
+    path_in: DocxFile,
+    path_out: DocxFile,
     *replacements: tuple[str, str],
     html: bool = False,
-) -> None:
+    lean: bool = True,
+    report: Report | None = None,
+) -> Replacer:
     """Replace text in a docx file.
 
-    :param path_in: path to input docx
-    :param path_out: path to output docx with text replaced
+    :param path_in: path to input docx, or a seekable binary file-like object
+    :param path_out: path to output docx with text replaced, or a binary
+        file-like object; it need not be seekable, so stdout works
     :param replacements: tuples of strings (a, b) replace a with b for each in docx.
-    :param html: respect formatting (as far as docx2python can see formatting)
+    :param html: respect formatting (as far as docx2python can see formatting);
+        only used when :lean: is False, which also needs a path for :path_out:
+    :param lean: edit the text parts of the package directly instead of loading
+        it through docx2python
+    :param report: collects where each old text matched and phase timings
+    :return: the Replacer used, for its match counts
     """
-    reader = docx2python(path_in, html=html).docx_reader
-    replacer = Replacer(*replacements)
-    for file in reader.content_files():
-        root = file.root_element
-        replacer.recursive_text_replace(root)
-    reader.save(path_out)
+    replacer = Replacer(*replacements, report=report)
+    if lean:
+        _replace_package_text(path_in, path_out, replacer)
+        return replacer
+
+    with _phase(report, "parse"):
+        # Only this path needs docx2python; it is slow to import
+        from docx2python.main import docx2python
+
+        reader = docx2python(path_in, html=html).docx_reader
+    with _phase(report, "match"):
+        for file in reader.content_files():
+            root = file.root_element
+            replacer.replace_text(root, file.path)
+    with _phase(report, "serialize"):
+        reader.save(path_out)
     reader.close()
+    return replacer
 
 
-# data_list = json.loads(
-#     '[{"originalText":"Recent coding bootcamp graduate with a passion for building dynamic, user-friendly web applications.","newText":"Aspiring Backend Developer with a strong foundation in building scalable and high-performance applications."},{"originalText":"Skilled in JavaScript, React and Node.js.","newText":"Proficient in Node.js, Express.js, and SQL, with a focus on backend development."},{"originalText":"Seeking to leverage my technical abilities and strong problem-solving skills in an entry-level full stack developer role.","newText":"Eager to contribute to backend development projects, focusing on digital mortgage and credit risk solutions."},{"originalText":"Acquired practical knowledge of full stack programming including React development, building Node servers using Express APIs and MongoDB databases.","newText":"Acquired practical knowledge of backend programming, including building scalable APIs and working with SQL databases."},{"originalText":"Collaborated with a team of four to create a JavaScript-based web application for ticket reselling, achieving first place in a hackathon.","newText":"Collaborated with cross-functional teams to integrate complex models and solutions into production environments."},{"originalText":"Developed a web-based event manager for the local student organisation using Angular.","newText":"Developed backend services and APIs for various applications, focusing on performance and reliability."},{"originalText":"Co-ordinated operational mission planning and generated concise presentations Introduced an effective management solution for important equipment.","newText":"Led technical discussions and provided mentorship to junior team members in software development practices."},{"originalText":"Operated in the advance team to setup and deploy security measures on a Jewish summer camp.","newText":"Implemented best practices for software development, including code reviews and continuous integration."},{"originalText":"Languages — Javascript | Kotlin | Java | Python","newText":"Languages — JavaScript | Kotlin | Java | Python | C#"},{"originalText":"Back-end — Node.js | Express.js | MongoDB | SQL | GraphQL","newText":"Back-end — Node.js | Express.js | SQL | .NET | C#"}]'
-# )
-data_list = json.loads(sys.argv[2])
-data_tuples = [
-    (obj["originalText"], obj["newText"]) for obj in data_list if obj["originalText"]
-]
+def replace_docx_bytes(data: bytes, *replacements: tuple[str, str]) -> bytes:
+    """Replace text in a docx held in memory.
 
-replace_docx_text(
-    sys.argv[1], sys.argv[1].replace(".docx", "_new.docx"), *data_tuples, html=True
-)
+    :param data: contents of the input docx
+    :param replacements: tuples of strings (a, b) replace a with b for each in docx.
+    :return: contents of the output docx
+    """
+    output = io.BytesIO()
+    replace_docx_text(io.BytesIO(data), output, *replacements)
+    return output.getvalue()
+
+
+def parse_replacements(data_list: list[dict]) -> list[tuple[str, str]]:
+    return [
+        (obj["originalText"], obj["newText"]) for obj in data_list if obj["originalText"]
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("file", type=str, help="Path to the docx, or - for stdin")
+    parser.add_argument(
+        "replacements",
+        type=str,
+        nargs="?",
+        help='JSON list of {"originalText", "newText"}',
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Path to write the new docx to, or - for stdout. Defaults to "
+        "<file>_new.docx, or stdout when reading stdin",
+    )
+    parser.add_argument(
+        "--batch",
+        type=str,
+        default=None,
+        help='JSON file with a list of {"output", "replacements"}, all rendered '
+        "from one compiled template",
+    )
+    parser.add_argument(
+        "--report",
+        type=str,
+        default=None,
+        help="Write a JSON report of matched and unmatched texts and phase timings "
+        "to this file, or - for stderr",
+    )
+    parser.add_argument(
+        "--debug",
+        type=int,
+        default=0,
+        help="1 logs each replacement to stderr, 2 also each paragraph scanned",
+    )
+    parser.add_argument(
+        "--template_cache",
+        type=str,
+        default=None,
+        help="Directory keeping compiled templates between runs; they are pickles, "
+        "so it must be writable only by trusted processes",
+    )
+    args = parser.parse_args()
+
+    from_stdin = args.file == "-"
+    source = io.BytesIO(sys.stdin.buffer.read()) if from_stdin else args.file
+    with_report = bool(args.report or args.debug)
+
+    def write_report(data):
+        if args.report == "-":
+            print(json.dumps(data), file=sys.stderr)
+        elif args.report:
+            with open(args.report, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4)
+
+    if args.batch:
+        with open(args.batch, encoding="utf-8") as f:
+            batch = json.load(f)
+        if from_stdin and not all(job.get("output") for job in batch):
+            parser.error('every --batch job needs an "output" when reading stdin')
+        jobs = [
+            (
+                job.get("output") or args.file.replace(".docx", f"_new_{indx}.docx"),
+                parse_replacements(job["replacements"]),
+            )
+            for indx, job in enumerate(batch)
+        ]
+        # Through the imported module rather than __main__, so cached
+        # templates pickle as docx_replace.Template and docx_worker can load them
+        import docx_replace
+
+        replacers = docx_replace.render_batch(
+            source, jobs, args.template_cache, with_report, args.debug
+        )
+        if with_report:
+            write_report([replacer.report.to_dict(replacer) for replacer in replacers])
+        print(
+            json.dumps(
+                [
+                    {"output": str(path_out), "unmatched": replacer.unmatched()}
+                    for (path_out, _), replacer in zip(jobs, replacers)
+                ]
+            )
+        )
+    elif args.replacements is not None:
+        data_tuples = parse_replacements(json.loads(args.replacements))
+        output = args.output or (
+            "-" if from_stdin else args.file.replace(".docx", "_new.docx")
+        )
+        report = Report(args.debug) if with_report else None
+        replacer = replace_docx_text(
+            source,
+            sys.stdout.buffer if output == "-" else output,
+            *data_tuples,
+            html=True,
+            report=report,
+        )
+        if report is not None:
+            write_report(report.to_dict(replacer))
+    else:
+        parser.error("either replacements or --batch is required")
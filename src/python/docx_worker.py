@@ -0,0 +1,305 @@
+import argparse
+import asyncio
+import base64
+import functools
+import io
+import json
+import multiprocessing
+import os
+import signal
+import sys
+
+# Imported here so every pool process has them loaded before its first job;
+# docx2python is otherwise imported on first use
+import docx2python  # noqa: F401
+from docx_read import read_docx_text, read_docx_text_fast
+from docx_replace import Report, parse_replacements, render_batch, replace_docx_text
+from json_lines import serve_socket, serve_stdio
+
+# Long-running docx service: a pool of warm processes does the CPU-bound XML
+# work, fed from a bounded queue. Requests are JSON lines on stdin/stdout or a
+# local TCP socket, framed by json_lines.py as in linkedin_scraper.py's worker
+# mode:
+#   -> {"id": 1, "command": "read", "args": {"path": "temp/1.docx", "fast": true}}
+#   -> {"id": 2, "command": "replace", "args": {"path": "temp/1.docx",
+#           "output": "temp/1_new.docx", "replacements": [{"originalText": ...}]}}
+#   -> {"id": 3, "command": "render_batch", "args": {"path": "temp/1.docx",
+#           "jobs": [{"output": "temp/1_a.docx", "replacements": [...]}, ...]}}
+#   <- {"id": 1, "result": ...} or {"id": 1, "error": "..."}
+# Documents may be sent inline as base64 "data" instead of a "path"; replace
+# then answers with base64 "data" too unless an "output" path is given. With
+# "report": true in its args, replace also answers with a diagnostics "report".
+# A request may set "timeout" in seconds. When the queue is full the answer is
+#   <- {"id": 1, "error": "Queue full", "retry": true}
+# and the caller should back off and resend.
+
+
+def _source(path, data):
+    return base64.b64decode(data) if data is not None else path
+
+
+def read_command(path=None, data=None, fast=False):
+    source = _source(path, data)
+    return read_docx_text_fast(source) if fast else read_docx_text(source)
+
+
+def replace_command(replacements, path=None, data=None, output=None, report=False):
+    source = _source(path, data)
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    target = output or io.BytesIO()
+    replacer = replace_docx_text(
+        source,
+        target,
+        *parse_replacements(replacements),
+        report=Report() if report else None,
+    )
+    result = {"unmatched": replacer.unmatched()}
+    if report:
+        result["report"] = replacer.report.to_dict(replacer)
+    if output:
+        result["output"] = output
+    else:
+        result["data"] = base64.b64encode(target.getvalue()).decode("ascii")
+    return result
+
+
+def render_batch_command(jobs, path=None, data=None):
+    pairs = [(job["output"], parse_replacements(job["replacements"])) for job in jobs]
+    replacers = render_batch(_source(path, data), pairs)
+    return [
+        {"output": output, "unmatched": replacer.unmatched()}
+        for (output, _), replacer in zip(pairs, replacers)
+    ]
+
+
+docx_commands = {
+    "ping": os.getpid,
+    "read": read_command,
+    "replace": replace_command,
+    "render_batch": render_batch_command,
+}
+
+
+def pool_process_main(conn):
+    # The service handles Ctrl-C and stops the pool itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            command, args = conn.recv()
+        except EOFError:
+            break
+        try:
+            conn.send((True, docx_commands[command](**args)))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+
+
+class JobError(Exception):
+    pass
+
+
+class PoolProcess:
+    # spawn rather than fork: the parent runs an event loop and executor threads
+    context = multiprocessing.get_context("spawn")
+
+    def __init__(self):
+        self.conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=pool_process_main, args=(child_conn,), daemon=True
+        )
+        self.process.start()
+        # Without closing our copy of the child's end, recv would never see EOF
+        child_conn.close()
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join()
+        self.conn.close()
+
+
+class DocxPool:
+    def __init__(self, size=None, queue_size=64, timeout=60):
+        """Run docx commands in a fixed set of warm processes.
+
+        :param size: number of processes, defaults to the number of cores
+        :param queue_size: jobs allowed to wait for a free process; more are
+            rejected with asyncio.QueueFull
+        :param timeout: seconds a job may run before its process is killed and
+            replaced
+        """
+        self.size = size or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.idle = None
+        self.processes = set()
+        self.waiting = 0
+        self.replacing = set()
+
+    async def start(self):
+        self.idle = asyncio.Queue()
+        started = [self.spawn() for _ in range(self.size)]
+        await asyncio.gather(*(self.warm(process) for process in started))
+        for process in started:
+            self.idle.put_nowait(process)
+
+    async def warm(self, process):
+        # Wait until the process has finished its imports
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.call, process, "ping", {})
+
+    async def replace(self):
+        process = self.spawn()
+        try:
+            await self.warm(process)
+        except Exception as e:
+            print(f"Replacement pool process failed to start: {e}", file=sys.stderr)
+            self.retire(process)
+            return
+        self.idle.put_nowait(process)
+
+    def spawn(self):
+        process = PoolProcess()
+        self.processes.add(process)
+        return process
+
+    def retire(self, process):
+        self.processes.discard(process)
+        process.stop()
+
+    def stop(self):
+        for task in self.replacing:
+            task.cancel()
+        for process in list(self.processes):
+            self.retire(process)
+
+    @staticmethod
+    def call(process, command, args):
+        process.conn.send((command, args))
+        return process.conn.recv()
+
+    async def run(self, command, args, timeout=None):
+        if self.idle.empty() and self.waiting >= self.queue_size:
+            raise asyncio.QueueFull()
+
+        self.waiting += 1
+        try:
+            process = await self.idle.get()
+        finally:
+            self.waiting -= 1
+
+        loop = asyncio.get_running_loop()
+        try:
+            ok, result = await asyncio.wait_for(
+                loop.run_in_executor(None, self.call, process, command, args),
+                timeout or self.timeout,
+            )
+        except (asyncio.TimeoutError, asyncio.CancelledError, EOFError, OSError):
+            # Timed out, cancelled or died: the process may still be busy with
+            # the job, so replace it. The replacement only becomes idle once
+            # warm, so the next job does not wait out its imports.
+            self.retire(process)
+            task = asyncio.create_task(self.replace())
+            self.replacing.add(task)
+            task.add_done_callback(self.replacing.discard)
+            raise
+        except BaseException:
+            # The job could not be sent, so the process is still fine
+            self.idle.put_nowait(process)
+            raise
+        self.idle.put_nowait(process)
+
+        if not ok:
+            raise JobError(result)
+        return result
+
+
+async def handle_docx_request(pool: DocxPool, line, respond):
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError as e:
+        return respond({"id": None, "error": f"Invalid request: {e}"})
+    if not isinstance(request, dict):
+        error = f"Invalid request: expected an object, got {type(request).__name__}"
+        return respond({"id": None, "error": error})
+
+    request_id = request.get("id")
+    command = request.get("command")
+    if command not in docx_commands:
+        return respond({"id": request_id, "error": f"Unknown command: {command}"})
+
+    timeout = request.get("timeout")
+    if timeout is None:
+        timeout = pool.timeout
+    # bool is an int, but "timeout": true is a mistake
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not timeout > 0:
+        return respond(
+            {"id": request_id, "error": f"Invalid timeout: {timeout!r}, expected seconds > 0"}
+        )
+    try:
+        result = await pool.run(command, request.get("args", {}), timeout)
+        respond({"id": request_id, "result": result})
+    except asyncio.QueueFull:
+        respond({"id": request_id, "error": "Queue full", "retry": True})
+    except asyncio.TimeoutError:
+        respond({"id": request_id, "error": f"Timed out after {timeout}s"})
+    except JobError as e:
+        respond({"id": request_id, "error": str(e)})
+    except Exception as e:
+        respond({"id": request_id, "error": f"{type(e).__name__}: {e}"})
+
+
+async def run_service(host, port, workers, queue_size, timeout):
+    pool = DocxPool(workers, queue_size, timeout)
+    await pool.start()
+    try:
+        handle = functools.partial(handle_docx_request, pool)
+        if port:
+            # Inline documents make for long lines
+            await serve_socket(handle, host, port, limit=2**26)
+        else:
+            await serve_stdio(handle)
+    finally:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Interface to listen on",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="Serve on this TCP port instead of stdin/stdout",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Pool processes (default: number of cores)",
+    )
+    parser.add_argument(
+        "--queue_size",
+        type=int,
+        default=64,
+        help="Jobs allowed to wait for a free process before requests are rejected",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=60,
+        help="Seconds a job may run before its process is restarted",
+    )
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(
+            run_service(args.host, args.port, args.workers, args.queue_size, args.timeout)
+        )
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,168 @@
+import asyncio
+import time
+from collections import deque
+from contextvars import ContextVar
+
+# Priority lanes, served in this order
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Lane of the fetches started from the current task. Tasks inherit it, so
+# setting it once at an entry point covers every fetch made under it.
+priority: ContextVar[int] = ContextVar("priority", default=BACKGROUND)
+
+
+class Flight:
+    __slots__ = ("lane", "limiter", "waiter")
+
+    def __init__(self, lane: int) -> None:
+        """A fetch shared by coalesced callers, in the highest lane among them.
+
+        :param lane: lane of the caller that started it
+        """
+        self.lane = lane
+        # Where the fetch is queued while it waits for a token
+        self.limiter: HostLimiter | None = None
+        self.waiter: asyncio.Future | None = None
+
+    def upgrade(self, lane: int) -> None:
+        """Move the fetch up to :lane:, requeueing it if it is waiting for a token."""
+        if lane >= self.lane:
+            return
+        self.lane = lane
+        if self.waiter is not None and not self.waiter.done():
+            self.limiter.requeue(self.waiter, lane)
+
+
+# The flight run by the current task, so its requests use the flight's lane
+flight_context: ContextVar[Flight | None] = ContextVar("flight_context", default=None)
+
+
+class HostLimiter:
+    def __init__(self, rate: float, burst: int) -> None:
+        """Token bucket for one host, handing out tokens to the highest lane first.
+
+        :param rate: tokens added per second
+        :param burst: most tokens that can be saved up
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lanes: tuple[deque, deque] = (deque(), deque())
+        self.drainer: asyncio.Task | None = None
+
+    def _take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def _next_waiter(self) -> asyncio.Future | None:
+        for lane in self.lanes:
+            while lane:
+                waiter = lane.popleft()
+                # Cancelled waiters are dropped without using a token
+                if not waiter.done():
+                    return waiter
+        return None
+
+    async def acquire(self, lane: int, flight: Flight | None = None) -> None:
+        """Wait for a token in :lane:.
+
+        :param flight: fetch making the request, kept pointed at the queued
+            waiter so a coalesced caller can move it to a higher lane
+        """
+        if not any(self.lanes) and self._take():
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self.lanes[lane].append(waiter)
+        if flight is not None:
+            flight.limiter, flight.waiter = self, waiter
+        if self.drainer is None or self.drainer.done():
+            self.drainer = asyncio.create_task(self._drain())
+        try:
+            await waiter
+        finally:
+            if flight is not None:
+                flight.limiter = flight.waiter = None
+
+    def requeue(self, waiter: asyncio.Future, lane: int) -> None:
+        for queue in self.lanes:
+            if waiter in queue:
+                queue.remove(waiter)
+                break
+        else:
+            return
+        self.lanes[lane].append(waiter)
+
+    async def _drain(self) -> None:
+        while True:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            while not self._take():
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+            if waiter.done():
+                # Cancelled while we waited; the token goes to the next one
+                self.tokens += 1
+                continue
+            waiter.set_result(None)
+
+
+class FetchScheduler:
+    def __init__(self, rate: float = 0, burst: int = 5) -> None:
+        """Pace requests per host and merge concurrent fetches of the same URL.
+
+        :param rate: requests per second allowed to each host; 0 disables pacing
+        :param burst: requests a host may get at once after a quiet period
+
+        Waiting requests are released interactive lane first, so details opened
+        by a user overtake a background crawl to the same host. A background
+        fetch joined by an interactive caller moves to the interactive lane.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.limiters: dict[str, HostLimiter] = {}
+        self.inflight: dict[str, tuple[asyncio.Future, Flight]] = {}
+        self.coalesced = 0
+
+    async def acquire(self, host: str) -> None:
+        """Wait for a request slot to :host: in the current priority lane."""
+        if self.rate <= 0:
+            return
+        limiter = self.limiters.get(host)
+        if limiter is None:
+            limiter = self.limiters[host] = HostLimiter(self.rate, self.burst)
+        flight = flight_context.get()
+        if flight is None:
+            await limiter.acquire(priority.get())
+        else:
+            await limiter.acquire(flight.lane, flight)
+
+    async def coalesce(self, key: str, fetch):
+        """Run :fetch:, or join the run already in flight for :key:.
+
+        :param key: identity of the request, usually normalize_url(url)
+        :param fetch: coroutine function making the request
+        """
+        entry = self.inflight.get(key)
+        if entry is None:
+            flight = Flight(priority.get())
+            # The task copies the context here, flight included
+            token = flight_context.set(flight)
+            try:
+                task = asyncio.ensure_future(fetch())
+            finally:
+                flight_context.reset(token)
+            self.inflight[key] = (task, flight)
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        else:
+            task, flight = entry
+            flight.upgrade(priority.get())
+            self.coalesced += 1
+        # One caller giving up must not cancel the fetch for the others
+        return await asyncio.shield(task)
@@ -0,0 +1,250 @@
+import json
+import random
+from collections import OrderedDict
+
+
+headers_list = {
+    "chrome": {
+        "Connection": "keep-alive",
+        "Cache-Control": "max-age=0",
+        "sec-ch-ua": '" Not A;Brand";v="99", "Chromium";v="99", "Google Chrome";v="99"',
+        "sec-ch-ua-mobile": "?0",
+        "sec-ch-ua-platform": "Windows",
+        "Upgrade-Insecure-Requests": "1",
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/99.0.4844.51 Safari/537.36",
+        "Accept": " text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9",
+        "Sec-Fetch-Site": "none",
+        "Sec-Fetch-Mode": "navigate",
+        "Sec-Fetch-User": "?1",
+        "Sec-Fetch-Dest": "document",
+        "Accept-Encoding": "gzip, deflate, br",
+        "Accept-Language": "en-US,en;q=0.9",
+    },
+    # "firefox": {
+    #     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:98.0) Gecko/20100101 Firefox/98.0",
+    #     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+    #     "Accept-Language": "en-US,en;q=0.5",
+    #     "Accept-Encoding": "gzip, deflate",
+    #     "Connection": "keep-alive",
+    #     "Upgrade-Insecure-Requests": "1",
+    #     "Sec-Fetch-Dest": "document",
+    #     "Sec-Fetch-Mode": "navigate",
+    #     "Sec-Fetch-Site": "none",
+    #     "Sec-Fetch-User": "?1",
+    #     "Cache-Control": "max-age=0",
+    # },
+    "safari": {
+        "Upgrade-Insecure-Requests": "1",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.0 Safari/605.1.15",
+        "Accept-Language": "en-gb",
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    },
+    "edge": {
+        "Connection": "keep-alive",
+        "Cache-Control": "max-age=0",
+        "sec-ch-ua": '" Not A;Brand";v="99", "Chromium";v="99", "Microsoft Edge";v="99"',
+        "sec-ch-ua-mobile": "?0",
+        "sec-ch-ua-platform": "Windows",
+        "Upgrade-Insecure-Requests": "1",
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/99.0.4844.51 Safari/537.36 Edg/99.0.1150.30",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9",
+        "Sec-Fetch-Site": "none",
+        "Sec-Fetch-Mode": "navigate",
+        "Sec-Fetch-User": "?1",
+        "Sec-Fetch-Dest": "document",
+        "Accept-Encoding": "gzip, deflate, br",
+        "Accept-Language": "en-GB,en;q=0.9,en-US;q=0.8,fi;q=0.7",
+    },
+}
+
+# Create ordered dict from Headers above
+ordered_headers_list = {}
+for key, headers in headers_list.items():
+    h = OrderedDict()
+    for header, value in headers.items():
+        h[header] = value
+    ordered_headers_list[key] = h
+
+browsers = [  # Edge
+    "edge99",
+    "edge101",
+    # Chrome
+    "chrome99",
+    "chrome100",
+    "chrome101",
+    "chrome104",
+    "chrome107",
+    "chrome110",
+    "chrome116",
+    "chrome119",
+    "chrome120",
+    "chrome123",
+    "chrome124",
+    # Safari
+    "safari15_3",
+    "safari15_5",
+    "safari17_0",
+]
+
+# Built by get_options; ua_generator and user_agents are slow to import, so they
+# load only when profiles are generated rather than read from a file
+options = None
+
+
+def get_options():
+    global options
+    if options is None:
+        from ua_generator.data.version import VersionRange
+        from ua_generator.options import Options
+
+        options = Options(
+            version_ranges={
+                "chrome": VersionRange(min_version=99),
+                "safari": VersionRange(min_version=16),
+                "edge": VersionRange(min_version=99),
+            }
+        )
+    return options
+
+
+class Profile:
+    __slots__ = ("browser", "headers", "impersonate", "successes", "failures")
+
+    def __init__(self, browser: str, headers: dict, impersonate: str) -> None:
+        self.browser = browser
+        self.headers = headers
+        self.impersonate = impersonate
+        self.successes = 0
+        self.failures = 0
+
+    @property
+    def weight(self) -> float:
+        # Laplace smoothing keeps unproven profiles in rotation
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+    def to_dict(self) -> dict:
+        return {
+            "browser": self.browser,
+            "headers": self.headers,
+            "impersonate": self.impersonate,
+        }
+
+
+def build_profile(browser: str) -> Profile | None:
+    """Generate a user agent for :browser: and pair it with an impersonation target.
+
+    :param browser: a key of ordered_headers_list
+    :return: a consistent profile, or None when curl_cffi has no target old
+        enough for the generated browser version
+    """
+    import ua_generator
+    from user_agents import parse
+
+    headers = ordered_headers_list[browser].copy()
+    platform = (
+        "windows"
+        if browser == "edge"
+        else "macos" if browser == "safari" else ("windows", "macos", "linux")
+    )
+    user_agent = ua_generator.generate(
+        browser=browser, platform=platform, options=get_options()
+    )
+    ua_headers = user_agent.headers.get()
+    ua_headers["User-Agent"] = ua_headers.pop("user-agent")
+
+    for key, value in ua_headers.items():
+        headers[key] = value
+
+    if user_agent.platform == "android":
+        return Profile(browser, headers, "chrome99_android")
+    if user_agent.platform == "ios":
+        return Profile(browser, headers, "safari17_2_ios")
+
+    version = float(
+        ".".join(parse(user_agent.text).browser.version_string.split(".")[:2])
+    )
+    targets = [
+        target
+        for target in browsers
+        if browser in target
+        and float(target.replace(browser, "").replace("_", ".")) <= version
+    ]
+    return Profile(browser, headers, targets[-1]) if targets else None
+
+
+def build_profiles(count: int) -> list[Profile]:
+    profiles = []
+    for _ in range(count * 10):
+        profile = build_profile(random.choice(list(ordered_headers_list)))
+        if profile is not None:
+            profiles.append(profile)
+            if len(profiles) == count:
+                break
+    return profiles
+
+
+def load_profiles(path: str) -> list[Profile]:
+    with open(path, encoding="utf-8") as f:
+        return [
+            Profile(p["browser"], OrderedDict(p["headers"]), p["impersonate"])
+            for p in json.load(f)
+        ]
+
+
+def save_profiles(path: str, profiles: list[Profile]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([p.to_dict() for p in profiles], f, indent=4)
+
+
+class ProfileTable:
+    def __init__(self, profiles: list[Profile], rebuild_every: int = 32) -> None:
+        """Pick fingerprint profiles at random, favouring ones that get 200s.
+
+        :param profiles: precomputed profiles to choose from
+        :param rebuild_every: reports between rebuilds of the weighted alias table
+
+        choose() is O(1) via Vose's alias method; the table is rebuilt from the
+        current success weights every :rebuild_every: reports.
+        """
+        if not profiles:
+            raise ValueError("No fingerprint profiles to choose from")
+        self.profiles = profiles
+        self.rebuild_every = rebuild_every
+        self.reports = 0
+        self.rebuild()
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def choose(self) -> Profile:
+        indx = random.randrange(len(self.profiles))
+        if random.random() >= self.probability[indx]:
+            indx = self.alias[indx]
+        return self.profiles[indx]
+
+    def report(self, profile: Profile, success: bool) -> None:
+        if success:
+            profile.successes += 1
+        else:
+            profile.failures += 1
+        self.reports += 1
+        if self.reports % self.rebuild_every == 0:
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        n = len(self.profiles)
+        weights = [p.weight for p in self.profiles]
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+        self.probability = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, w in enumerate(scaled) if w < 1]
+        large = [i for i, w in enumerate(scaled) if w >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] += scaled[less] - 1
+            (small if scaled[more] < 1 else large).append(more)
@@ -0,0 +1,187 @@
+import datetime
+import sqlite3
+import time
+
+from job_records import DETAILS_FIELDS, FIELDS, LIST_FIELDS
+from sanitize import description_text
+
+DAYS_SINCE_POSTED = {
+    "past month": 30,
+    "past week": 7,
+    "24hr": 1,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    position TEXT,
+    company TEXT COLLATE NOCASE,
+    location TEXT,
+    date TEXT,
+    job_url TEXT,
+    company_logo TEXT,
+    ago_time TEXT,
+    applicants TEXT,
+    level TEXT,
+    type TEXT,
+    description TEXT,
+    description_text TEXT,
+    listed_at REAL,
+    details_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_company ON jobs (company);
+CREATE INDEX IF NOT EXISTS jobs_location ON jobs (location);
+CREATE INDEX IF NOT EXISTS jobs_date ON jobs (date);
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    position, company, location, description_text,
+    content='jobs', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts (rowid, position, company, location, description_text)
+    VALUES (new.rowid, new.position, new.company, new.location, new.description_text);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+    INSERT INTO jobs_fts (jobs_fts, rowid, position, company, location, description_text)
+    VALUES ('delete', old.rowid, old.position, old.company, old.location, old.description_text);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE ON jobs BEGIN
+    INSERT INTO jobs_fts (jobs_fts, rowid, position, company, location, description_text)
+    VALUES ('delete', old.rowid, old.position, old.company, old.location, old.description_text);
+    INSERT INTO jobs_fts (rowid, position, company, location, description_text)
+    VALUES (new.rowid, new.position, new.company, new.location, new.description_text);
+END;
+"""
+
+
+def fts_phrase(text):
+    # Quote every word so user input never reaches FTS5 query syntax
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+class JobIndex:
+    def __init__(self, path: str) -> None:
+        """Scraped jobs stored in SQLite, searchable without scraping.
+
+        :param path: database file, created if missing
+
+        Jobs are upserted by LinkedIn id; list cards and posting details fill
+        their own columns, so a later list crawl never erases details. Position,
+        company, location and description text are indexed with FTS5.
+        """
+        self.connection = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+
+    def _upsert(self, rows, fields, stamp_column, stamp):
+        columns = ["id", *fields, stamp_column]
+        # Missing values keep what is already stored
+        updates = ", ".join(
+            f"{column} = COALESCE(excluded.{column}, jobs.{column})"
+            for column in columns[1:]
+        )
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT INTO jobs ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT (id) DO UPDATE SET {updates}",
+                [(*row, stamp) for row in rows],
+            )
+
+    def upsert_jobs(self, jobs, listed_at=None):
+        """Store job list cards, or jobs already merged with their details."""
+        listed_at = listed_at or time.time()
+        with_details = [job for job in jobs if getattr(job, "description", None) is not None]
+        self._upsert(
+            [[job.id, *(getattr(job, field) for field in LIST_FIELDS)] for job in jobs],
+            LIST_FIELDS,
+            "listed_at",
+            listed_at,
+        )
+        for job in with_details:
+            self.upsert_details(job.id, job, listed_at)
+
+    def upsert_details(self, job_id, details, fetched_at=None):
+        """Store posting details, a JobDetails or a Job merged with its details."""
+        fields = DETAILS_FIELDS + ("description_text",)
+        values = [getattr(details, field) for field in DETAILS_FIELDS]
+        values.append(description_text(details.description))
+        self._upsert([[job_id, *values]], fields, "details_at", fetched_at or time.time())
+
+    def get(self, job_id):
+        row = self.connection.execute(
+            f"SELECT id, {', '.join(FIELDS)} FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+    def fresh_details(self, job_ids, max_age):
+        """Return {id: details} for the jobs whose details are younger than :max_age: seconds."""
+        if not job_ids:
+            return {}
+        placeholders = ", ".join("?" * len(job_ids))
+        rows = self.connection.execute(
+            f"SELECT id, {', '.join(DETAILS_FIELDS)} FROM jobs "
+            f"WHERE id IN ({placeholders}) AND details_at >= ?",
+            (*job_ids, time.time() - max_age),
+        ).fetchall()
+        return {row["id"]: {field: row[field] for field in DETAILS_FIELDS} for row in rows}
+
+    def search(
+        self,
+        keywords=None,
+        location=None,
+        company=None,
+        date_since_posted=None,
+        since=None,
+        limit=25,
+        offset=0,
+    ):
+        """Return stored jobs matching the filters, best keyword matches first.
+
+        :param keywords: words to find in the position, company, location or description
+        :param location: words to find in the location
+        :param company: exact company name, ignoring case
+        :param date_since_posted: "24hr", "past week" or "past month", as for the scraper
+        :param since: earliest posting date, YYYY-MM-DD
+        """
+        columns = ", ".join(f"jobs.{column}" for column in ("id", *FIELDS))
+        where = []
+        params = []
+        match = []
+        if keywords:
+            match.append(fts_phrase(keywords))
+        if location:
+            match.append(f"location : ({fts_phrase(location)})")
+        if match:
+            query = (
+                f"SELECT {columns} FROM jobs_fts "
+                "JOIN jobs ON jobs.rowid = jobs_fts.rowid"
+            )
+            where.append("jobs_fts MATCH ?")
+            params.append(" AND ".join(match))
+        else:
+            query = f"SELECT {columns} FROM jobs"
+        if company:
+            where.append("jobs.company = ?")
+            params.append(company)
+        days = DAYS_SINCE_POSTED.get(date_since_posted)
+        if days:
+            cutoff = (datetime.date.today() - datetime.timedelta(days=days)).isoformat()
+            since = max(since, cutoff) if since else cutoff
+        if since:
+            where.append("jobs.date >= ?")
+            params.append(since)
+
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        if keywords:
+            query += " ORDER BY bm25(jobs_fts)"
+        else:
+            query += " ORDER BY jobs.date DESC, jobs.id DESC"
+        query += " LIMIT ? OFFSET ?"
+        params += [int(limit), int(offset)]
+        return [dict(row) for row in self.connection.execute(query, params)]
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,102 @@
+# Columns filled from job list cards and from job posting pages
+LIST_FIELDS = (
+    "position",
+    "company",
+    "location",
+    "date",
+    "job_url",
+    "company_logo",
+    "ago_time",
+)
+DETAILS_FIELDS = (
+    "position",
+    "company",
+    "location",
+    "company_logo",
+    "ago_time",
+    "applicants",
+    "level",
+    "type",
+    "description",
+)
+FIELDS = LIST_FIELDS + tuple(f for f in DETAILS_FIELDS if f not in LIST_FIELDS)
+
+
+class JobDetails:
+    __slots__ = DETAILS_FIELDS
+
+    def __init__(
+        self,
+        position,
+        company,
+        location,
+        company_logo,
+        ago_time,
+        applicants,
+        level,
+        type,
+        description,
+    ) -> None:
+        self.position = position
+        self.company = company
+        self.location = location
+        self.company_logo = company_logo
+        self.ago_time = ago_time
+        self.applicants = applicants
+        self.level = level
+        self.type = type
+        self.description = description
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other) -> bool:
+        return type(other) is type(self) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"JobDetails({self.to_dict()!r})"
+
+
+class Job:
+    # Details fields stay unset, and out of to_dict, until merge
+    __slots__ = ("id", *FIELDS, "details_error")
+
+    def __init__(
+        self,
+        id,
+        position,
+        company,
+        location,
+        date,
+        job_url,
+        company_logo,
+        ago_time,
+    ) -> None:
+        self.id = id
+        self.position = position
+        self.company = company
+        self.location = location
+        self.date = date
+        self.job_url = job_url
+        self.company_logo = company_logo
+        self.ago_time = ago_time
+
+    def merge(self, details: JobDetails) -> None:
+        for name in DETAILS_FIELDS:
+            setattr(self, name, getattr(details, name))
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__ if hasattr(self, name)}
+
+    def __eq__(self, other) -> bool:
+        return type(other) is type(self) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"Job({self.to_dict()!r})"
+
+
+def to_json(obj):
+    """json.dumps default: serialize job records as the dicts they replace."""
+    if isinstance(obj, (Job, JobDetails)):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import sys
+
+# JSON-lines framing shared by the long-running workers (linkedin_scraper.py's
+# worker mode and docx_worker.py): one request per line in, one response per
+# line out, on stdin/stdout or a local TCP socket. Each worker passes its own
+#   async def handle(line, respond)
+# which parses the request and calls respond(response) with a JSON-serializable
+# object one or more times. Requests are handled concurrently, so responses
+# may go out in a different order than the requests came in.
+
+
+async def serve_lines(handle, read_line, write_line, default=None):
+    """Run :handle: for every line :read_line: returns until end of input.
+
+    :param default: json.dumps default for what responses hold
+    """
+    pending = set()
+
+    def respond(response):
+        write_line(json.dumps(response, separators=(",", ":"), default=default))
+
+    while True:
+        line = await read_line()
+        if not line:
+            break
+        if not line.strip():
+            continue
+        task = asyncio.create_task(handle(line, respond))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    if pending:
+        await asyncio.gather(*pending)
+
+
+async def serve_stdio(handle, default=None):
+    loop = asyncio.get_running_loop()
+
+    async def read_line():
+        return await loop.run_in_executor(None, sys.stdin.readline)
+
+    def write_line(line):
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+
+    await serve_lines(handle, read_line, write_line, default)
+
+
+async def serve_socket(handle, host, port, default=None, limit=2**16):
+    """Serve every connection to :host: and :port: until cancelled.
+
+    :param limit: longest line accepted, in bytes
+    """
+
+    async def handle_connection(reader, writer):
+        def write_line(line):
+            writer.write(line.encode() + b"\n")
+
+        try:
+            await serve_lines(handle, reader.readline, write_line, default)
+            await writer.drain()
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    server = await asyncio.start_server(handle_connection, host, port, limit=limit)
+    async with server:
+        await server.serve_forever()
@@ -1,17 +1,42 @@
+from __future__ import annotations
+
 import argparse
 import json
-from curl_cffi import CurlHttpVersion
-from bs4 import BeautifulSoup
-import random
-from collections import OrderedDict
-from fp.fp import FreeProxy
-import ua_generator
-from curl_cffi.requests import AsyncSession
+from fingerprints import ProfileTable, build_profiles, load_profiles, save_profiles
+from proxy_pool import ProxyPool
+from retry_policy import (
+    BLOCKED,
+    CLIENT_ERROR,
+    CONNECTION_ERROR,
+    NOT_FOUND,
+    SUCCESS,
+    THROTTLED,
+    CircuitBreaker,
+    RetryPolicy,
+    classify,
+)
+from response_cache import MemoryCache, ResponseCache, SqliteCache, normalize_url
+from metrics import Metrics
+from session_pool import SessionPool
+from fetch_scheduler import BACKGROUND, INTERACTIVE, FetchScheduler, priority
+from job_index import JobIndex
+from job_records import Job, JobDetails, to_json
+from json_lines import serve_socket, serve_stdio
+from sanitize import format_description
+from poll_state import PollState, search_key
 import asyncio
-from ua_generator.options import Options
-from ua_generator.data.version import VersionRange, Version
-from user_agents import parse
+import functools
+import importlib.util
+import os
 import sys
+import time
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+# bs4, curl_cffi, FreeProxy and the lxml parser load on first use, so that
+# --help, search and other paths that never fetch or parse start quickly
+if TYPE_CHECKING:
+    from curl_cffi.requests import AsyncSession
 
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
@@ -63,16 +88,16 @@ def parse_job_list(jobs):
             )
 
             data.append(
-                {
-                    "id": jobid,
-                    "position": position,
-                    "company": company,
-                    "location": location,
-                    "date": date,
-                    "job_url": job_url,
-                    "company_logo": company_logo,
-                    "ago_time": ago_time,
-                }
+                Job(
+                    id=jobid,
+                    position=position,
+                    company=company,
+                    location=location,
+                    date=date,
+                    job_url=job_url,
+                    company_logo=company_logo,
+                    ago_time=ago_time,
+                )
             )
         except AttributeError:
             continue
@@ -119,198 +144,236 @@ def parse_job_details(job):
     #     separator="\n\n", strip=True
     # )
 
-    return {
-        "position": position,
-        "company": company,
-        "location": location,
-        "company_logo": company_logo,
-        "ago_time": ago_time,
-        "applicants": applicants,
-        "level": level,
-        "type": type,
-        "description": str(description),
-    }
+    return JobDetails(
+        position=position,
+        company=company,
+        location=location,
+        company_logo=company_logo,
+        ago_time=ago_time,
+        applicants=applicants,
+        level=level,
+        type=type,
+        description=str(description),
+    )
 
 
-headers_list = {
-    "chrome": {
-        "Connection": "keep-alive",
-        "Cache-Control": "max-age=0",
-        "sec-ch-ua": '" Not A;Brand";v="99", "Chromium";v="99", "Google Chrome";v="99"',
-        "sec-ch-ua-mobile": "?0",
-        "sec-ch-ua-platform": "Windows",
-        "Upgrade-Insecure-Requests": "1",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/99.0.4844.51 Safari/537.36",
-        "Accept": " text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9",
-        "Sec-Fetch-Site": "none",
-        "Sec-Fetch-Mode": "navigate",
-        "Sec-Fetch-User": "?1",
-        "Sec-Fetch-Dest": "document",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Accept-Language": "en-US,en;q=0.9",
-    },
-    # "firefox": {
-    #     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:98.0) Gecko/20100101 Firefox/98.0",
-    #     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-    #     "Accept-Language": "en-US,en;q=0.5",
-    #     "Accept-Encoding": "gzip, deflate",
-    #     "Connection": "keep-alive",
-    #     "Upgrade-Insecure-Requests": "1",
-    #     "Sec-Fetch-Dest": "document",
-    #     "Sec-Fetch-Mode": "navigate",
-    #     "Sec-Fetch-Site": "none",
-    #     "Sec-Fetch-User": "?1",
-    #     "Cache-Control": "max-age=0",
-    # },
-    "safari": {
-        "Upgrade-Insecure-Requests": "1",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.0 Safari/605.1.15",
-        "Accept-Language": "en-gb",
-        "Accept-Encoding": "gzip, deflate",
-        "Connection": "keep-alive",
-    },
-    "edge": {
-        "Connection": "keep-alive",
-        "Cache-Control": "max-age=0",
-        "sec-ch-ua": '" Not A;Brand";v="99", "Chromium";v="99", "Microsoft Edge";v="99"',
-        "sec-ch-ua-mobile": "?0",
-        "sec-ch-ua-platform": "Windows",
-        "Upgrade-Insecure-Requests": "1",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/99.0.4844.51 Safari/537.36 Edg/99.0.1150.30",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9",
-        "Sec-Fetch-Site": "none",
-        "Sec-Fetch-Mode": "navigate",
-        "Sec-Fetch-User": "?1",
-        "Sec-Fetch-Dest": "document",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Accept-Language": "en-GB,en;q=0.9,en-US;q=0.8,fi;q=0.7",
-    },
-}
+# Built on first use by get_proxies
+proxies: ProxyPool | None = None
+sticky_proxies = True
 
-# Create ordered dict from Headers above
-ordered_headers_list = {}
-for key, headers in headers_list.items():
-    h = OrderedDict()
-    for header, value in headers.items():
-        h[header] = value
-    ordered_headers_list[key] = h
-
-proxies = FreeProxy(elite=True, rand=True, country_id=["US", "BR"])
-
-browsers = [  # Edge
-    "edge99",
-    "edge101",
-    # Chrome
-    "chrome99",
-    "chrome100",
-    "chrome101",
-    "chrome104",
-    "chrome107",
-    "chrome110",
-    "chrome116",
-    "chrome119",
-    "chrome120",
-    "chrome123",
-    "chrome124",
-    # Safari
-    "safari15_3",
-    "safari15_5",
-    "safari17_0",
-]
-
-options = Options(
-    version_ranges={
-        "chrome": VersionRange(min_version=99),
-        "safari": VersionRange(min_version=16),
-        "edge": VersionRange(min_version=99),
-    }
-)
 
+def configure_proxies(sticky=True):
+    global proxies, sticky_proxies
+    proxies, sticky_proxies = None, sticky
 
-async def async_request(client: AsyncSession, url, indx=0):
-    retry = 0
-    while retry < 20:
-        # print(f"{indx}: {url}")
-        proxy = proxies.get()
-        type, type_headers = random.choice(list(ordered_headers_list.items()))
-        headers = type_headers.copy()
-        platform = (
-            "windows"
-            if type == "edge"
-            else "macos" if type == "safari" else ("windows", "macos", "linux")
-        )
-        user_agent = ua_generator.generate(
-            browser=type, platform=platform, options=options
+
+def get_proxies() -> ProxyPool:
+    global proxies
+    if proxies is None:
+        from fp.fp import FreeProxy
+
+        proxies = ProxyPool(
+            FreeProxy(elite=True, rand=True, country_id=["US", "BR"]),
+            sticky=sticky_proxies,
         )
-        ua_headers = user_agent.headers.get()
-        ua_headers["User-Agent"] = ua_headers.pop("user-agent")
+    return proxies
+
+
+# Keep-alive sessions per (proxy, impersonation target) opened by open_sessions
+max_sessions = 32
+
+
+def open_sessions() -> SessionPool:
+    return SessionPool(max_sessions)
+
+
+# Built on first use by get_profiles, or loaded from --profiles
+profiles: ProfileTable | None = None
+profiles_path = None
+profile_count = 200
 
-        for key, value in ua_headers.items():
-            headers[key] = value
 
-        version = ".".join(parse(user_agent.text).browser.version_string.split(".")[:2])
+def configure_profiles(path=None, count=200):
+    global profiles, profiles_path, profile_count
+    profiles, profiles_path, profile_count = None, path, count
 
-        if user_agent.platform == "android":
-            filtered_browser = "chrome99_android"
-        elif user_agent.platform == "ios":
-            filtered_browser = "safari17_2_ios"
+
+def get_profiles() -> ProfileTable:
+    global profiles
+    if profiles is None:
+        if profiles_path and os.path.exists(profiles_path):
+            profiles = ProfileTable(load_profiles(profiles_path))
         else:
-            try:
-                filtered_browser = [
-                    browser
-                    for browser in browsers
-                    if type in browser
-                    and float(browser.replace(type, "").replace("_", "."))
-                    <= float(version)
-                ]
-                if len(filtered_browser) > 0:
-                    filtered_browser = filtered_browser[-1]
-                else:
-                    continue
-            except Exception as e:
-                print(e)
-                print(type)
-                print(platform)
-                print(version)
-                print(json.dumps(headers, indent=4))
-                continue
+            profiles = ProfileTable(build_profiles(profile_count))
+            if profiles_path:
+                save_profiles(profiles_path, profiles.profiles)
+    return profiles
+
+
+retry_policy = RetryPolicy()
+breaker = CircuitBreaker()
+scheduler = FetchScheduler()
+metrics = Metrics()
+
+
+async def async_request(client: AsyncSession, url, indx=0, policy: RetryPolicy = None):
+    with metrics.phase("fetch"):
+        return await _async_request(client, url, indx, policy or retry_policy)
+
 
+async def _async_request(client: AsyncSession, url, indx, policy: RetryPolicy):
+    host = urlsplit(url).netloc
+    with metrics.phase("profile"):
+        profile_table = get_profiles()
+    proxy_pool = get_proxies()
+    attempt = 0
+    proxy = None
+    while True:
+        if not breaker.allow(host):
+            return f"Circuit open for {host}"
+        if proxy is None:
+            with metrics.phase("proxy"):
+                proxy = await proxy_pool.get()
+        with metrics.phase("profile"):
+            profile = profile_table.choose()
+        with metrics.phase("rate_limit"):
+            await scheduler.acquire(host)
+        size = 0
         try:
+            start = time.perf_counter()
             response = await client.get(
                 url,
-                impersonate=filtered_browser,
-                headers=headers,
-                proxies={"http": proxy.split("//")[1]},
+                impersonate=profile.impersonate,
+                headers=profile.headers,
+                # curl picks the proxy by scheme; LinkedIn is https
+                proxies={"http": proxy, "https": proxy},
             )
-            if response.status_code == 200:
-                # print(f"{indx} Success {user_agent.text}")
-                # print(type)
-                # print(platform)
-                # print(version)
-                # print(filtered_browser)
-                # print(json.dumps(headers, indent=4))
-                return (indx, response.text)
-            else:
-                # print(f"{indx} Failed")
-                retry = retry + 1
-        except Exception as e:
-            # print(f"{indx}: Connection error {e}")
-            retry = retry + 1
-    return "Max retry reached"
+            size = len(response.content)
+            outcome = classify(response.status_code)
+        except Exception:
+            outcome = classify(None)
+        elapsed = time.perf_counter() - start
+        metrics.observe("request", elapsed)
+        metrics.record_attempt(proxy, profile.impersonate, outcome == SUCCESS, size)
+
+        breaker.record(host, outcome)
+        if outcome == SUCCESS:
+            proxy_pool.report_success(proxy, elapsed)
+            profile_table.report(profile, True)
+            return (indx, response.text)
+
+        if outcome in (THROTTLED, BLOCKED, CONNECTION_ERROR):
+            proxy_pool.report_failure(proxy)
+            profile_table.report(profile, False)
+
+        attempt += 1
+        decision = policy.decide(outcome, attempt)
+        if not decision.retry:
+            if outcome == NOT_FOUND:
+                return f"Not found ({response.status_code})"
+            if outcome == CLIENT_ERROR:
+                return f"Request rejected ({response.status_code})"
+            return "Max retry reached"
+        metrics.record_retry(outcome)
+        if decision.rotate_proxy:
+            proxy = None
+        if decision.delay:
+            with metrics.phase("backoff"):
+                await asyncio.sleep(decision.delay)
+
+
+# Set by configure_cache; None disables caching
+cache: ResponseCache | None = None
+
+
+def configure_cache(ttl, stale_ttl, max_entries, db_path=None):
+    global cache
+    backend = SqliteCache(db_path, max_entries) if db_path else MemoryCache(max_entries)
+    cache = ResponseCache(backend, ttl=ttl, stale_ttl=stale_ttl)
+
+
+async def fetch_response(client: AsyncSession, url, use_cache=True):
+    if cache is None or not use_cache:
+        return await async_request(client, url)
+
+    error = None
+
+    async def fetch():
+        nonlocal error
+        response = await async_request(client, url)
+        if isinstance(response, str):
+            # Failures are not cached; keep the reason for the caller
+            error = response
+            return None
+        return response[1]
+
+    text = await cache.fetch(normalize_url(url), fetch)
+    return (error or "Max retry reached") if text is None else (0, text)
+
+
+async def cached_request(client: AsyncSession, url, indx=0, use_cache=True):
+    # Concurrent requests for the same URL share a single fetch; one that
+    # skips the cache only shares with others that skip it
+    key = normalize_url(url) if use_cache else f"uncached {normalize_url(url)}"
+    response = await scheduler.coalesce(
+        key, lambda: fetch_response(client, url, use_cache)
+    )
+    return response if isinstance(response, str) else (indx, response[1])
+
+
+# Set by configure_index; None keeps scraped jobs only in the output
+job_index: JobIndex | None = None
+index_max_age = 86400
+
+
+def configure_index(db_path, max_age=86400):
+    global job_index, index_max_age
+    job_index = JobIndex(db_path)
+    index_max_age = max_age
+
+
+# Set by configure_poll_state; needed by the poll command
+poll_state: PollState | None = None
+
+
+def configure_poll_state(db_path):
+    global poll_state
+    poll_state = PollState(db_path)
 
 
 async def get_url(url):
-    async with AsyncSession() as s:
+    async with open_sessions() as s:
         response = await async_request(s, url)
         return response
 
 
-async def get_urls(urls):
-    async with AsyncSession(http_version=CurlHttpVersion.V1_1) as s:
-        tasks = [async_request(s, url, indx) for indx, url in enumerate(urls)]
-        responses = await asyncio.gather(*tasks)
-        return responses
+async def iter_urls(client: AsyncSession, urls, concurrency=None, use_cache=True):
+    # Fetches run concurrently (at most `concurrency` at a time) but responses
+    # are yielded in the order of `urls`, each as soon as it and its
+    # predecessors have completed. A fetch that raises yields its exception
+    # instead, so one failure does not cancel the rest. use_cache=False
+    # always asks the server, for pages that must be current.
+    semaphore = asyncio.Semaphore(concurrency or max(len(urls), 1))
+
+    async def fetch(indx, url):
+        async with semaphore:
+            try:
+                return await cached_request(client, url, indx, use_cache)
+            except Exception as e:
+                return e
+
+    tasks = [asyncio.create_task(fetch(indx, url)) for indx, url in enumerate(urls)]
+    try:
+        for task in tasks:
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def get_urls(urls, concurrency=None):
+    async with open_sessions() as s:
+        return [response async for response in iter_urls(s, urls, concurrency)]
 
 
 def get_date_since_posted(date_since_posted: str) -> str:
@@ -373,7 +436,13 @@ def get_salary(salary: str = "") -> str:
         return ""
 
 
-def get_job_list(
+JOB_LIST_URL = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search?"
+JOB_DETAILS_URL = "https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/{}"
+PAGE_SIZE = 25
+DEFAULT_CONCURRENCY = 5
+
+
+def build_job_list_url(
     keywords,
     location,
     date_since_posted,
@@ -381,10 +450,9 @@ def get_job_list(
     remote_filter,
     job_type,
     sort_by,
+    start=0,
 ):
-    job_list_url = (
-        f"https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search?"
-    )
+    job_list_url = JOB_LIST_URL
 
     if keywords:
         job_list_url += f"keywords={keywords}"
@@ -399,59 +467,598 @@ def get_job_list(
     if job_type and get_job_type(job_type):
         job_list_url += f"&f_JT={get_job_type(job_type)}"
 
-    job_list_url += f"&start={0}"
+    job_list_url += f"&start={start}"
 
     if sort_by in ["recent", "relevant"]:
         sort_method = "R" if sort_by == "relevant" else "DD"
         job_list_url += f"&sortBy={sort_method}"
 
-    job_list_response = asyncio.run(get_url(job_list_url))
-    soup = BeautifulSoup(job_list_response[1], "html.parser")
-    alljobs_on_this_page = soup.find_all("li")
-    job_list = parse_job_list(alljobs_on_this_page)
+    return job_list_url
 
-    # job_details_response = asyncio.run(
-    #     get_urls([job_details_url.format(job["id"]) for job in job_list])
-    # )
-    # for job in job_details_response:
-    #     soup = BeautifulSoup(job[1], "html.parser")
-    #     for key, value in parse_job_details(soup).items():
-    #         job_list[job[0]][key] = value
+
+# "bs4" or "lxml"; both produce identical output (see parser_parity.py)
+parser_backend = "bs4"
+# "html" as scraped, "clean" or "text"; the job index always keeps the html
+description_format = "html"
+# "json", "compact" or "msgpack", for the CLI's non-streaming output. msgpack is
+# an optional dependency, left out of requirements.txt since the services only
+# read JSON
+output_format = "json"
+
+
+def parse_job_list_page(html):
+    start = time.perf_counter()
+    if parser_backend == "lxml":
+        from lxml_parser import parse_job_list_html
+
+        job_list = parse_job_list_html(html)
+    else:
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, "html.parser")
+        alljobs_on_this_page = soup.find_all("li")
+        job_list = parse_job_list(alljobs_on_this_page)
+    metrics.record_parse("list", time.perf_counter() - start)
     return job_list
 
 
-def get_job_details(job_id):
-    job_details_url = "https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/{}"
-    job_details_response = asyncio.run(get_url(job_details_url.format(job_id)))
-    soup = BeautifulSoup(job_details_response[1], "html.parser")
-    return parse_job_details(soup)
+def parse_job_details_page(html):
+    start = time.perf_counter()
+    if parser_backend == "lxml":
+        from lxml_parser import parse_job_details_html
+
+        details = parse_job_details_html(html)
+    else:
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, "html.parser")
+        details = parse_job_details(soup)
+    metrics.record_parse("details", time.perf_counter() - start)
+    return details
+
+
+def present_details(details: JobDetails) -> JobDetails:
+    details.description = format_description(details.description, description_format)
+    return details
+
+
+def parse_job_list_response(response):
+    if isinstance(response, (str, Exception)):
+        return []
+    return parse_job_list_page(response[1])
+
+
+async def iter_job_list(
+    client: AsyncSession,
+    keywords=None,
+    location=None,
+    date_since_posted=None,
+    experience_level=None,
+    remote_filter=None,
+    job_type=None,
+    sort_by=None,
+    start=0,
+    pages=1,
+    concurrency=DEFAULT_CONCURRENCY,
+    use_cache=True,
+):
+    job_list_urls = [
+        build_job_list_url(
+            keywords,
+            location,
+            date_since_posted,
+            experience_level,
+            remote_filter,
+            job_type,
+            sort_by,
+            int(start) + page * PAGE_SIZE,
+        )
+        for page in range(int(pages))
+    ]
+
+    # Pages overlap when new postings shift results while we crawl
+    seen = set()
+    async for response in iter_urls(client, job_list_urls, int(concurrency), use_cache):
+        job_list = []
+        for job in parse_job_list_response(response):
+            if job.id not in seen:
+                seen.add(job.id)
+                job_list.append(job)
+        if job_index is not None and job_list:
+            job_index.upsert_jobs(job_list)
+        yield job_list
+
+
+async def iter_jobs(
+    client: AsyncSession,
+    concurrency=DEFAULT_CONCURRENCY,
+    with_details=False,
+    **filters,
+):
+    # Yields each job as soon as its page (or, with details, its posting) has
+    # been parsed, in result order
+    async for job_list in iter_job_list(client, concurrency=concurrency, **filters):
+        if not with_details:
+            for job in job_list:
+                yield job
+            continue
+
+        async for job in iter_with_details(client, job_list, concurrency):
+            yield job
+
+
+async def iter_with_details(client: AsyncSession, job_list, concurrency):
+    job_ids = [job.id for job in job_list]
+    async for indx, result in iter_job_details(client, job_ids, concurrency):
+        if "details" in result:
+            job_list[indx].merge(result["details"])
+        else:
+            job_list[indx].details_error = result["error"]
+        yield job_list[indx]
+
+
+async def fetch_job_list(client: AsyncSession, **filters):
+    return [job async for job in iter_jobs(client, **filters)]
+
+
+async def iter_new_jobs(
+    client: AsyncSession,
+    search_id=None,
+    max_pages=10,
+    concurrency=DEFAULT_CONCURRENCY,
+    with_details=False,
+    **filters,
+):
+    # Walks result pages newest first and yields only the jobs this saved
+    # search has not reported before, stopping at the first page that holds an
+    # already seen id. Details are fetched for the new jobs only. Pages skip
+    # the response cache, which would hide postings newer than its ttl.
+    if poll_state is None:
+        raise ValueError("No poll state configured, pass --poll_db")
+    # Polling only works newest first, whatever order the request asked for
+    filters.pop("sort_by", None)
+    key = search_id or search_key(filters)
+    seen = poll_state.load(key)
+    try:
+        for page in range(int(max_pages)):
+            job_list = []
+            async for job_list in iter_job_list(
+                client, sort_by="recent", start=page * PAGE_SIZE, use_cache=False, **filters
+            ):
+                pass
+            new_jobs = [job for job in job_list if job.id not in seen]
+
+            if with_details:
+                async for job in iter_with_details(client, new_jobs, concurrency):
+                    yield job
+            else:
+                for job in new_jobs:
+                    yield job
+            seen.update(job.id for job in new_jobs)
+
+            if len(new_jobs) < len(job_list) or len(job_list) < PAGE_SIZE:
+                break
+    finally:
+        poll_state.save(key, seen)
+
+
+async def fetch_new_jobs(client: AsyncSession, **filters):
+    return [job async for job in iter_new_jobs(client, **filters)]
+
+
+def parse_job_details_response(job_id, response):
+    if isinstance(response, Exception):
+        return {"id": job_id, "error": f"{type(response).__name__}: {response}"}
+    if isinstance(response, str):
+        return {"id": job_id, "error": response}
+    try:
+        return {"id": job_id, "details": parse_job_details_page(response[1])}
+    except AttributeError:
+        return {"id": job_id, "error": "Unexpected job posting markup"}
+
+
+async def iter_job_details(client: AsyncSession, job_ids, concurrency):
+    # Details still fresh in the job index are served from it; only the rest
+    # are scraped, and stored once parsed
+    fresh = (
+        job_index.fresh_details(job_ids, index_max_age) if job_index is not None else {}
+    )
+    job_details_urls = [
+        JOB_DETAILS_URL.format(job_id) for job_id in job_ids if job_id not in fresh
+    ]
+    responses = iter_urls(client, job_details_urls, int(concurrency))
+    try:
+        for indx, job_id in enumerate(job_ids):
+            if job_id in fresh:
+                details = JobDetails(**fresh[job_id])
+                yield indx, {"id": job_id, "details": present_details(details)}
+                continue
+            result = parse_job_details_response(job_id, await anext(responses))
+            if "details" in result:
+                if job_index is not None:
+                    job_index.upsert_details(job_id, result["details"])
+                present_details(result["details"])
+            yield indx, result
+    finally:
+        await responses.aclose()
+
+
+async def fetch_job_details(client: AsyncSession, job_id):
+    if job_index is not None:
+        fresh = job_index.fresh_details([job_id], index_max_age)
+        if job_id in fresh:
+            return present_details(JobDetails(**fresh[job_id]))
+    job_details_response = await cached_request(client, JOB_DETAILS_URL.format(job_id))
+    if isinstance(job_details_response, str):
+        raise ValueError(job_details_response)
+    details = parse_job_details_page(job_details_response[1])
+    if job_index is not None:
+        job_index.upsert_details(job_id, details)
+    return present_details(details)
+
+
+async def iter_job_details_batch(
+    client: AsyncSession, job_ids, concurrency=DEFAULT_CONCURRENCY
+):
+    async for _, result in iter_job_details(client, job_ids, concurrency):
+        yield result
+
+
+async def fetch_job_details_batch(
+    client: AsyncSession, job_ids, concurrency=DEFAULT_CONCURRENCY
+):
+    return [result async for result in iter_job_details_batch(client, job_ids, concurrency)]
+
+
+async def search_jobs(
+    client: AsyncSession, refresh=False, concurrency=DEFAULT_CONCURRENCY, **filters
+):
+    # Answered from the job index; with refresh, details that are missing or
+    # older than index_max_age are scraped first
+    if job_index is None:
+        raise ValueError("No job index configured, pass --index_db")
+    jobs = job_index.search(**filters)
+    if refresh:
+        job_ids = [job["id"] for job in jobs]
+        async for _ in iter_job_details(client, job_ids, concurrency):
+            pass
+        jobs = job_index.search(**filters)
+    for job in jobs:
+        job["description"] = format_description(job["description"], description_format)
+    return jobs
+
+
+def write_ndjson(item):
+    sys.stdout.write(json.dumps(item, separators=(",", ":"), default=to_json) + "\n")
+    sys.stdout.flush()
+
+
+def write_output(data):
+    if output_format == "msgpack":
+        import msgpack
+
+        sys.stdout.buffer.write(msgpack.packb(data, default=to_json))
+    elif output_format == "compact":
+        sys.stdout.write(json.dumps(data, separators=(",", ":"), default=to_json) + "\n")
+    else:
+        print(json.dumps(data, indent=4, default=to_json))
+    sys.stdout.flush()
+
+
+async def stream_ndjson(client: AsyncSession, iter_items, *args, **kwargs):
+    async for item in iter_items(client, *args, **kwargs):
+        write_ndjson(item)
+
+
+async def with_session(fetch, *args, output=None, **kwargs):
+    """Run :fetch: with a session pool, then wait for background cache refreshes.
+
+    :param output: called with the result before that wait, so a stale entry
+        reaches the caller without waiting for its refetch
+    """
+    async with open_sessions() as s:
+        try:
+            result = await fetch(s, *args, **kwargs)
+            if output is not None:
+                output(result)
+            return result
+        finally:
+            # A one-shot run would otherwise exit before refreshing stale
+            # entries it served, leaving them stale for the next process
+            if cache is not None:
+                await cache.drain()
+
+
+def get_job_list(
+    keywords,
+    location,
+    date_since_posted,
+    experience_level,
+    remote_filter,
+    job_type,
+    sort_by,
+    start=0,
+    pages=1,
+    concurrency=DEFAULT_CONCURRENCY,
+    with_details=False,
+    output=None,
+):
+    return asyncio.run(
+        with_session(
+            fetch_job_list,
+            output=output,
+            keywords=keywords,
+            location=location,
+            date_since_posted=date_since_posted,
+            experience_level=experience_level,
+            remote_filter=remote_filter,
+            job_type=job_type,
+            sort_by=sort_by,
+            start=start,
+            pages=pages,
+            concurrency=concurrency,
+            with_details=with_details,
+        )
+    )
+
+
+def get_job_details(job_id, output=None):
+    return asyncio.run(with_session(fetch_job_details, job_id, output=output))
+
+
+def get_job_details_batch(job_ids, concurrency=DEFAULT_CONCURRENCY, output=None):
+    return asyncio.run(
+        with_session(fetch_job_details_batch, job_ids, concurrency, output=output)
+    )
+
+
+async def get_metrics(client: AsyncSession, format="prometheus"):
+    # Counters since the process started; "json" gives the --stats layout
+    return metrics.to_dict() if format == "json" else metrics.to_prometheus()
+
+
+# Worker mode keeps one event loop and its keep-alive sessions open and serves
+# JSON-lines requests, either on stdin/stdout or on a local TCP socket:
+#   -> {"id": 1, "command": "list", "args": {"keywords": "python", ...}}
+#   -> {"id": 2, "command": "details", "args": {"job_id": "4012345678"}}
+#   -> {"id": 3, "command": "details_batch", "args": {"job_ids": ["40123", "40124"]}}
+#   -> {"id": 4, "command": "search", "args": {"keywords": "python", "refresh": true}}
+#   -> {"id": 5, "command": "poll", "args": {"keywords": "python", "search_id": "42"}}
+#   -> {"id": 6, "command": "metrics", "args": {"format": "prometheus"}}
+#   <- {"id": 1, "result": [...]} or {"id": 1, "error": "..."}
+# metrics answers with Prometheus text, or with a JSON object for "format": "json".
+# list, details_batch and poll also accept "stream": true, which answers with one
+#   <- {"id": 1, "item": {...}} line per job as it is parsed, then
+#   <- {"id": 1, "done": true}
+# Requests are handled concurrently, so responses may arrive out of order.
+worker_commands = {
+    "list": fetch_job_list,
+    "details": fetch_job_details,
+    "details_batch": fetch_job_details_batch,
+    "search": search_jobs,
+    "poll": fetch_new_jobs,
+    "metrics": get_metrics,
+}
+worker_streams = {
+    "list": iter_jobs,
+    "details_batch": iter_job_details_batch,
+    "poll": iter_new_jobs,
+}
+# Requests a user is waiting on; their fetches overtake list crawls and polls
+# when the per-host rate limit makes requests queue
+interactive_commands = {"details", "details_batch", "search"}
+
+
+async def handle_worker_request(client: AsyncSession, line, respond):
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError as e:
+        return respond({"id": None, "error": f"Invalid request: {e}"})
+    if not isinstance(request, dict):
+        error = f"Invalid request: expected an object, got {type(request).__name__}"
+        return respond({"id": None, "error": error})
+
+    request_id = request.get("id")
+    command = worker_commands.get(request.get("command"))
+    if command is None:
+        return respond(
+            {"id": request_id, "error": f"Unknown command: {request.get('command')}"}
+        )
+
+    stream = worker_streams.get(request.get("command")) if request.get("stream") else None
+    # Each request runs in its own task, so this only sets its own lane
+    priority.set(INTERACTIVE if request.get("command") in interactive_commands else BACKGROUND)
+    try:
+        if stream is not None:
+            async for item in stream(client, **request.get("args", {})):
+                respond({"id": request_id, "item": item})
+            respond({"id": request_id, "done": True})
+        else:
+            result = await command(client, **request.get("args", {}))
+            respond({"id": request_id, "result": result})
+    except Exception as e:
+        respond({"id": request_id, "error": f"{type(e).__name__}: {e}"})
+
+
+async def run_worker(host, port):
+    get_profiles()
+    get_proxies().start()
+    try:
+        async with open_sessions() as client:
+            handle = functools.partial(handle_worker_request, client)
+            if port:
+                await serve_socket(handle, host, port, default=to_json)
+            else:
+                await serve_stdio(handle, default=to_json)
+    finally:
+        await get_proxies().stop()
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--no_cache",
+        action="store_true",
+        help="Always scrape instead of serving cached responses",
+    )
+    parser.add_argument(
+        "--cache_db",
+        type=str,
+        default=None,
+        help="SQLite file to share the response cache across processes (default: in memory)",
+    )
+    parser.add_argument(
+        "--cache_ttl",
+        type=float,
+        default=3600,
+        help="Seconds a cached response is served as fresh",
+    )
+    parser.add_argument(
+        "--cache_stale_ttl",
+        type=float,
+        default=3600,
+        help="Seconds past the TTL a cached response is served while it is refreshed",
+    )
+    parser.add_argument(
+        "--cache_size",
+        type=int,
+        default=1000,
+        help="Maximum number of cached responses",
+    )
+    parser.add_argument(
+        "--parser",
+        type=str,
+        choices=["bs4", "lxml"],
+        default="bs4",
+        help="HTML parsing backend",
+    )
+    parser.add_argument(
+        "--profiles",
+        type=str,
+        default=None,
+        help="JSON file of browser fingerprint profiles, generated there if missing",
+    )
+    parser.add_argument(
+        "--profile_count",
+        type=int,
+        default=200,
+        help="Number of fingerprint profiles to generate",
+    )
+    parser.add_argument(
+        "--max_attempts",
+        type=int,
+        default=20,
+        help="Attempts per request before giving up",
+    )
+    parser.add_argument(
+        "--backoff_base",
+        type=float,
+        default=0.5,
+        help="Seconds of backoff after the first throttled or failed attempt",
+    )
+    parser.add_argument(
+        "--backoff_max",
+        type=float,
+        default=30,
+        help="Cap in seconds on a single backoff",
+    )
+    parser.add_argument(
+        "--breaker_threshold",
+        type=int,
+        default=20,
+        help="Consecutive throttled responses that stop requests to a host",
+    )
+    parser.add_argument(
+        "--breaker_recovery",
+        type=float,
+        default=30,
+        help="Seconds requests to a throttling host are rejected before probing it",
+    )
+    parser.add_argument(
+        "--index_db",
+        type=str,
+        default=None,
+        help="SQLite file storing every scraped job for the search command",
+    )
+    parser.add_argument(
+        "--index_max_age",
+        type=float,
+        default=86400,
+        help="Seconds stored job details are served instead of scraping them again",
+    )
+    parser.add_argument(
+        "--poll_db",
+        type=str,
+        default=None,
+        help="SQLite file remembering the jobs each saved search has reported",
+    )
+    parser.add_argument(
+        "--rate_limit",
+        type=float,
+        default=0,
+        help="Requests per second allowed to each host, 0 for no limit",
+    )
+    parser.add_argument(
+        "--rate_burst",
+        type=int,
+        default=5,
+        help="Requests a host may get at once before --rate_limit applies",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Write timings, retries and proxy success rates as JSON to stderr when done",
+    )
+    parser.add_argument(
+        "--max_sessions",
+        type=int,
+        default=32,
+        help="Keep-alive sessions kept open, one per proxy and impersonation target",
+    )
+    parser.add_argument(
+        "--rotate_proxies",
+        action="store_true",
+        help="Spread requests over the best proxies instead of reusing one until it fails",
+    )
+    parser.add_argument(
+        "--description",
+        type=str,
+        choices=["html", "clean", "text"],
+        default="html",
+        help="Job descriptions as scraped, reduced to basic formatting tags, or as plain text",
+    )
+    parser.add_argument(
+        "--output_format",
+        type=str,
+        choices=["json", "compact", "msgpack"],
+        default="json",
+        help="Indented JSON, minified JSON, or msgpack (optional: pip install msgpack, "
+        "not in requirements.txt)",
+    )
     subparser = parser.add_subparsers(dest="command")
 
-    list_parser = subparser.add_parser("list")
-    list_parser.add_argument(
+    # Search filters shared by list and poll
+    filters_parser = argparse.ArgumentParser(add_help=False)
+    filters_parser.add_argument(
         "--keywords",
         type=str,
         default=None,
         help='Keywords for the job search (e.g., "software engineer")',
     )
-    list_parser.add_argument(
+    filters_parser.add_argument(
         "--location",
         type=str,
         default=None,
         help='Location for the job search (e.g., "New York")',
     )
-    list_parser.add_argument(
+    filters_parser.add_argument(
         "--date_since_posted",
         type=str,
         choices=["past month", "past week", "24hr"],
         default=None,
         help='Date range for when the job was posted ("past month", "past week", "24hr")',
     )
-    list_parser.add_argument(
+    filters_parser.add_argument(
         "--experience_level",
         type=str,
         choices=[
@@ -465,14 +1072,14 @@ if __name__ == "__main__":
         default=None,
         help="Experience level required for the job",
     )
-    list_parser.add_argument(
+    filters_parser.add_argument(
         "--remote_filter",
         type=str,
         choices=["on-site", "on site", "remote", "hybrid"],
         default=None,
         help='Remote work filter ("on-site", "remote", "hybrid")',
     )
-    list_parser.add_argument(
+    filters_parser.add_argument(
         "--job_type",
         type=str,
         choices=[
@@ -488,6 +1095,7 @@ if __name__ == "__main__":
         default=None,
         help='Job type (e.g., "full-time", "contract")',
     )
+    list_parser = subparser.add_parser("list", parents=[filters_parser])
     list_parser.add_argument(
         "--sort_by",
         type=str,
@@ -495,27 +1103,284 @@ if __name__ == "__main__":
         default=None,
         help='Sort results by "recent" or "relevant"',
     )
+    list_parser.add_argument(
+        "--start",
+        type=int,
+        default=0,
+        help="Offset of the first result to fetch",
+    )
+    list_parser.add_argument(
+        "--pages",
+        type=int,
+        default=1,
+        help=f"Number of consecutive result pages ({PAGE_SIZE} jobs each) to fetch",
+    )
+    list_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Maximum number of pages fetched at the same time",
+    )
+    list_parser.add_argument(
+        "--with_details",
+        action="store_true",
+        help="Fill in the details of every listed job",
+    )
+    list_parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Stream each job as a compact JSON line as soon as it is parsed",
+    )
 
     details_parser = subparser.add_parser("details")
-    details_parser.add_argument("id", type=str, help="Get job details by ID")
+    details_parser.add_argument(
+        "id", type=str, nargs="+", help="Get job details by ID (several with --batch)"
+    )
+    details_parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Fetch details for every given ID and report a result per ID",
+    )
+    details_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Maximum number of job postings fetched at the same time",
+    )
+    details_parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Stream each result as a compact JSON line as soon as it is parsed",
+    )
+
+    poll_parser = subparser.add_parser("poll", parents=[filters_parser])
+    poll_parser.add_argument(
+        "--search_id",
+        type=str,
+        default=None,
+        help="Name of the saved search (default: derived from the filters)",
+    )
+    poll_parser.add_argument(
+        "--max_pages",
+        type=int,
+        default=10,
+        help="Most result pages walked before giving up on reaching seen jobs",
+    )
+    poll_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Maximum number of job postings fetched at the same time",
+    )
+    poll_parser.add_argument(
+        "--with_details",
+        action="store_true",
+        help="Fill in the details of every new job",
+    )
+    poll_parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Stream each new job as a compact JSON line as soon as it is parsed",
+    )
+
+    search_parser = subparser.add_parser("search")
+    search_parser.add_argument(
+        "--keywords",
+        type=str,
+        default=None,
+        help="Words to find in the position, company, location or description",
+    )
+    search_parser.add_argument(
+        "--location",
+        type=str,
+        default=None,
+        help="Words to find in the location",
+    )
+    search_parser.add_argument(
+        "--company",
+        type=str,
+        default=None,
+        help="Exact company name, ignoring case",
+    )
+    search_parser.add_argument(
+        "--date_since_posted",
+        type=str,
+        choices=["past month", "past week", "24hr"],
+        default=None,
+        help='Date range for when the job was posted ("past month", "past week", "24hr")',
+    )
+    search_parser.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        help="Earliest posting date (YYYY-MM-DD)",
+    )
+    search_parser.add_argument(
+        "--limit",
+        type=int,
+        default=25,
+        help="Maximum number of jobs to return",
+    )
+    search_parser.add_argument(
+        "--offset",
+        type=int,
+        default=0,
+        help="Number of matching jobs to skip",
+    )
+    search_parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Scrape details that are missing or older than --index_max_age",
+    )
+    search_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Maximum number of job postings fetched at the same time",
+    )
+
+    worker_parser = subparser.add_parser("worker")
+    worker_parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Interface to bind when serving over a socket",
+    )
+    worker_parser.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="Serve JSON-lines requests on this TCP port instead of stdin/stdout",
+    )
 
     args = parser.parse_args()
 
-    if args.command == "list":
-        print(
-            json.dumps(
-                get_job_list(
-                    args.keywords,
-                    args.location,
-                    args.date_since_posted,
-                    args.experience_level,
-                    args.remote_filter,
-                    args.job_type,
-                    args.sort_by,
-                ),
-                indent=4,
+    parser_backend = args.parser
+    description_format = args.description
+    output_format = args.output_format
+    # Only checked here; write_output imports it, so other formats never load it
+    if output_format == "msgpack" and importlib.util.find_spec("msgpack") is None:
+        parser.error(
+            "--output_format msgpack needs the optional msgpack package (pip install msgpack)"
+        )
+    max_sessions = args.max_sessions
+    configure_proxies(sticky=not args.rotate_proxies)
+    retry_policy = RetryPolicy(args.max_attempts, args.backoff_base, args.backoff_max)
+    breaker = CircuitBreaker(args.breaker_threshold, args.breaker_recovery)
+    scheduler = FetchScheduler(args.rate_limit, args.rate_burst)
+    configure_profiles(args.profiles, args.profile_count)
+
+    if not args.no_cache:
+        configure_cache(
+            args.cache_ttl, args.cache_stale_ttl, args.cache_size, args.cache_db
+        )
+    if args.index_db:
+        configure_index(args.index_db, args.index_max_age)
+    if args.poll_db:
+        configure_poll_state(args.poll_db)
+
+    if args.command == "list" and args.ndjson:
+        asyncio.run(
+            with_session(
+                stream_ndjson,
+                iter_jobs,
+                keywords=args.keywords,
+                location=args.location,
+                date_since_posted=args.date_since_posted,
+                experience_level=args.experience_level,
+                remote_filter=args.remote_filter,
+                job_type=args.job_type,
+                sort_by=args.sort_by,
+                start=args.start,
+                pages=args.pages,
+                concurrency=args.concurrency,
+                with_details=args.with_details,
             )
         )
 
+    elif args.command == "list":
+        get_job_list(
+            args.keywords,
+            args.location,
+            args.date_since_posted,
+            args.experience_level,
+            args.remote_filter,
+            args.job_type,
+            args.sort_by,
+            args.start,
+            args.pages,
+            args.concurrency,
+            args.with_details,
+            output=write_output,
+        )
+
     elif args.command == "details":
-        print(json.dumps(get_job_details(args.id), indent=4))
+        if args.batch and args.ndjson:
+            asyncio.run(
+                with_session(
+                    stream_ndjson, iter_job_details_batch, args.id, args.concurrency
+                )
+            )
+        elif args.batch:
+            get_job_details_batch(args.id, args.concurrency, output=write_output)
+        elif len(args.id) > 1:
+            details_parser.error("pass --batch to fetch several IDs")
+        else:
+            try:
+                get_job_details(
+                    args.id[0], output=write_ndjson if args.ndjson else write_output
+                )
+            except ValueError as e:
+                details_parser.exit(1, f"{e}\n")
+
+    elif args.command == "poll":
+        if poll_state is None:
+            poll_parser.error("the poll command needs --poll_db")
+        filters = {
+            "keywords": args.keywords,
+            "location": args.location,
+            "date_since_posted": args.date_since_posted,
+            "experience_level": args.experience_level,
+            "remote_filter": args.remote_filter,
+            "job_type": args.job_type,
+            "search_id": args.search_id,
+            "max_pages": args.max_pages,
+            "concurrency": args.concurrency,
+            "with_details": args.with_details,
+        }
+        if args.ndjson:
+            asyncio.run(with_session(stream_ndjson, iter_new_jobs, **filters))
+        else:
+            asyncio.run(with_session(fetch_new_jobs, output=write_output, **filters))
+
+    elif args.command == "search":
+        if job_index is None:
+            search_parser.error("the search command needs --index_db")
+        filters = {
+            "keywords": args.keywords,
+            "location": args.location,
+            "company": args.company,
+            "date_since_posted": args.date_since_posted,
+            "since": args.since,
+            "limit": args.limit,
+            "offset": args.offset,
+        }
+        if args.refresh:
+            asyncio.run(
+                with_session(
+                    search_jobs,
+                    refresh=True,
+                    concurrency=args.concurrency,
+                    output=write_output,
+                    **filters,
+                )
+            )
+        else:
+            # No scraping, so no session to open
+            write_output(asyncio.run(search_jobs(None, **filters)))
+
+    elif args.command == "worker":
+        asyncio.run(run_worker(args.host, args.port))
+
+    if args.stats:
+        print(json.dumps({"stats": metrics.to_dict()}, indent=4), file=sys.stderr)
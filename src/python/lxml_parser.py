@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import lxml.html
+from lxml import etree
+
+from job_records import Job, JobDetails
+
+if TYPE_CHECKING:
+    from lxml.etree import _Element as EtreeElement  # type: ignore
+
+# lxml counterparts of parse_job_list/parse_job_details in linkedin_scraper.py.
+# Output must stay identical to the BeautifulSoup path; run parser_parity.py
+# against the saved fixtures after touching either side.
+
+# class token -> field, first match in document order wins (like bs4 find)
+LIST_CLASSES = {
+    "base-search-card__title": "position",
+    "base-search-card__subtitle": "company",
+    "job-search-card__location": "location",
+    "base-card__full-link": "job_url",
+    "artdeco-entity-image": "company_logo",
+    "job-search-card__listdate": "ago_time",
+}
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _class_path(*classes: str) -> str:
+    return "".join(f"[{_has_class(name)}]" for name in classes)
+
+
+def _criteria_path(position: int) -> etree.XPath:
+    return etree.XPath(
+        f"//*{_class_path('description__job-criteria-item')}"
+        f"[count(preceding-sibling::*) = {position - 1}]"
+        f"//*{_class_path('description__job-criteria-text--criteria')}"
+    )
+
+
+DETAILS_PATHS = {
+    "position": etree.XPath(f"//*{_class_path('topcard__title')}"),
+    "company": etree.XPath(f"//*{_class_path('topcard__flavor--black-link')}"),
+    "location": etree.XPath(
+        f"//*{_class_path('topcard__flavor', 'topcard__flavor--bullet')}"
+    ),
+    "company_logo": etree.XPath(f"//*{_class_path('artdeco-entity-image')}"),
+    "ago_time": etree.XPath(f"//*{_class_path('posted-time-ago__text')}"),
+    "applicants": etree.XPath(f"//*{_class_path('num-applicants__caption')}"),
+    "level": _criteria_path(1),
+    "type": _criteria_path(2),
+    "description": etree.XPath(f"//*{_class_path('relative', 'overflow-hidden')}"),
+}
+
+# Attributes BeautifulSoup treats as whitespace-separated lists
+MULTI_VALUED_ATTRIBUTES = {
+    "class",
+    "rel",
+    "rev",
+    "accept-charset",
+    "headers",
+    "accesskey",
+    "dropzone",
+}
+VOID_ELEMENTS = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "keygen",
+    "link",
+    "menuitem",
+    "meta",
+    "param",
+    "source",
+    "track",
+    "wbr",
+    "basefont",
+    "bgsound",
+    "command",
+    "frame",
+    "image",
+    "isindex",
+    "nextid",
+    "spacer",
+}
+RAW_TEXT_ELEMENTS = {"script", "style"}
+PRESERVE_WHITESPACE_ELEMENTS = {"pre", "textarea"}
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+
+def _document(html: str) -> EtreeElement | None:
+    if not html or not html.strip():
+        return None
+    return lxml.html.document_fromstring(html)
+
+
+def get_text(elem: EtreeElement) -> str:
+    """Return the text of :elem: the way bs4's get_text(strip=True) does."""
+    return "".join(text.strip() for text in elem.itertext() if text.strip())
+
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _quote_attribute(name: str, value: str | None) -> str:
+    if value is None:
+        value = ""
+    elif name in MULTI_VALUED_ATTRIBUTES:
+        value = " ".join(value.split())
+    value = _escape(value)
+    if '"' in value:
+        if "'" in value:
+            return f'"{value.replace(chr(34), "&quot;")}"'
+        return f"'{value}'"
+    return f'"{value}"'
+
+
+def _text(text: str, raw: bool, preserve: bool) -> str:
+    # bs4 collapses whitespace-only strings to a single newline or space
+    if not preserve and not text.strip(ASCII_SPACES):
+        return "\n" if "\n" in text else " "
+    return text if raw else _escape(text)
+
+
+def to_html(elem: EtreeElement) -> str:
+    """Serialize :elem: the way str() serializes a bs4 tag parsed by html.parser.
+
+    :param elem: an lxml html element
+    :return: markup without the element's tail
+    """
+    parts: list[str] = []
+
+    def write(node: EtreeElement, raw: bool, preserve: bool) -> None:
+        if not isinstance(node.tag, str):
+            if node.tag is etree.Comment:
+                parts.append(f"<!--{node.text or ''}-->")
+            return
+
+        attributes = "".join(
+            f" {name}={_quote_attribute(name, value)}"
+            for name, value in node.attrib.items()
+        )
+        if node.tag in VOID_ELEMENTS and not len(node) and not node.text:
+            parts.append(f"<{node.tag}{attributes}/>")
+            return
+
+        raw = raw or node.tag in RAW_TEXT_ELEMENTS
+        inner_preserve = preserve or node.tag in PRESERVE_WHITESPACE_ELEMENTS
+        parts.append(f"<{node.tag}{attributes}>")
+        if node.text:
+            parts.append(_text(node.text, raw, inner_preserve))
+        for child in node:
+            write(child, raw, inner_preserve)
+            if child.tail:
+                parts.append(_text(child.tail, raw, inner_preserve))
+        parts.append(f"</{node.tag}>")
+
+    write(elem, False, False)
+    return "".join(parts)
+
+
+def parse_job_list_html(html: str) -> list[Job]:
+    """Parse a seeMoreJobPostings page in a single pass over each card."""
+    root = _document(html)
+    if root is None:
+        return []
+
+    data = []
+    for job in root.iter("li"):
+        base_card = None
+        date_element = None
+        found: dict[str, EtreeElement] = {}
+        for elem in job.iterdescendants(etree.Element):
+            if elem.tag == "time" and date_element is None:
+                date_element = elem
+            class_attr = elem.get("class")
+            if not class_attr:
+                continue
+            for name in class_attr.split():
+                if name == "base-card" and elem.tag == "div" and base_card is None:
+                    base_card = elem
+                field = LIST_CLASSES.get(name)
+                if field is not None and field not in found:
+                    found[field] = elem
+
+        if base_card is None or base_card.get("data-entity-urn") is None:
+            continue
+
+        position = found.get("position")
+        company = found.get("company")
+        location = found.get("location")
+        job_url = found.get("job_url")
+        company_logo = found.get("company_logo")
+        ago_time = found.get("ago_time")
+
+        data.append(
+            Job(
+                id=base_card.get("data-entity-urn").split(":")[3],
+                position=get_text(position) if position is not None else None,
+                company=get_text(company) if company is not None else None,
+                location=get_text(location) if location is not None else None,
+                date=(
+                    date_element.get("datetime") if date_element is not None else None
+                ),
+                job_url=job_url.get("href") if job_url is not None else None,
+                company_logo=(
+                    company_logo.get("data-delayed-url")
+                    if company_logo is not None
+                    else None
+                ),
+                ago_time=get_text(ago_time) if ago_time is not None else None,
+            )
+        )
+    return data
+
+
+def parse_job_details_html(html: str) -> JobDetails:
+    """Parse a jobPosting page; raises AttributeError when a field is missing."""
+    root = _document(html)
+    if root is None:
+        raise AttributeError("Empty job posting")
+
+    elems = {}
+    for field, path in DETAILS_PATHS.items():
+        matches = path(root)
+        if not matches and field != "description":
+            raise AttributeError(f"Job posting has no {field}")
+        elems[field] = matches[0] if matches else None
+
+    description = elems["description"]
+    return JobDetails(
+        position=get_text(elems["position"]),
+        company=get_text(elems["company"]),
+        location=get_text(elems["location"]),
+        company_logo=elems["company_logo"].get("data-delayed-url"),
+        ago_time=get_text(elems["ago_time"]),
+        applicants=get_text(elems["applicants"]),
+        level=get_text(elems["level"]),
+        type=get_text(elems["type"]),
+        description=to_html(description) if description is not None else "None",
+    )
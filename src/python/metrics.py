@@ -0,0 +1,136 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Upper bounds in seconds, shared by every phase histogram
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self) -> None:
+        # One count per bucket plus the +Inf overflow
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """Yield (upper bound, observations at or below it), as Prometheus expects."""
+        total = 0
+        for bound, count in zip((*BUCKETS, "+Inf"), self.counts):
+            total += count
+            yield bound, total
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "buckets": {str(bound): total for bound, total in self.cumulative()},
+        }
+
+
+class Metrics:
+    def __init__(self) -> None:
+        """Counters and timings of the fetch and parse path.
+
+        Phases are timed into histograms; attempts are counted per outcome,
+        proxy and impersonation target, so a slow or failing run shows where
+        its time and retries went.
+        """
+        self.started = time.time()
+        self.phases: dict[str, Histogram] = {}
+        self.retries: dict[str, int] = {}
+        self.proxies: dict[str, list[int]] = {}
+        self.impersonations: dict[str, list[int]] = {}
+        self.bytes_fetched = 0
+        self.pages_parsed: dict[str, int] = {}
+
+    def observe(self, phase: str, seconds: float) -> None:
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = self.phases[phase] = Histogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def record_attempt(self, proxy: str, impersonate: str, success: bool, size: int = 0) -> None:
+        """Count one request attempt through :proxy: as :impersonate:."""
+        column = 0 if success else 1
+        self.proxies.setdefault(proxy, [0, 0])[column] += 1
+        self.impersonations.setdefault(impersonate, [0, 0])[column] += 1
+        self.bytes_fetched += size
+
+    def record_retry(self, outcome: str) -> None:
+        self.retries[outcome] = self.retries.get(outcome, 0) + 1
+
+    def record_parse(self, kind: str, seconds: float) -> None:
+        self.pages_parsed[kind] = self.pages_parsed.get(kind, 0) + 1
+        self.observe(f"parse_{kind}", seconds)
+
+    @staticmethod
+    def _rates(results: dict[str, list[int]]) -> dict:
+        return {
+            key: {
+                "successes": successes,
+                "failures": failures,
+                "success_rate": round(successes / (successes + failures), 3),
+            }
+            for key, (successes, failures) in sorted(results.items())
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "uptime": round(time.time() - self.started, 3),
+            "phases": {name: h.to_dict() for name, h in sorted(self.phases.items())},
+            "retries": dict(sorted(self.retries.items())),
+            "proxies": self._rates(self.proxies),
+            "impersonations": self._rates(self.impersonations),
+            "bytes_fetched": self.bytes_fetched,
+            "pages_parsed": dict(sorted(self.pages_parsed.items())),
+        }
+
+    def to_prometheus(self, prefix: str = "scraper") -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        lines = [f"# TYPE {prefix}_phase_seconds histogram"]
+        for name, histogram in sorted(self.phases.items()):
+            for bound, total in histogram.cumulative():
+                lines.append(
+                    f'{prefix}_phase_seconds_bucket{{phase="{name}",le="{bound}"}} {total}'
+                )
+            lines.append(f'{prefix}_phase_seconds_sum{{phase="{name}"}} {histogram.sum}')
+            lines.append(f'{prefix}_phase_seconds_count{{phase="{name}"}} {histogram.count}')
+
+        lines.append(f"# TYPE {prefix}_retries_total counter")
+        for cause, count in sorted(self.retries.items()):
+            lines.append(f'{prefix}_retries_total{{cause="{cause}"}} {count}')
+
+        for metric, label, results in (
+            ("proxy_attempts_total", "proxy", self.proxies),
+            ("impersonation_attempts_total", "impersonate", self.impersonations),
+        ):
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            for key, counts in sorted(results.items()):
+                for result, count in zip(("success", "failure"), counts):
+                    lines.append(
+                        f'{prefix}_{metric}{{{label}="{key}",result="{result}"}} {count}'
+                    )
+
+        lines.append(f"# TYPE {prefix}_fetched_bytes_total counter")
+        lines.append(f"{prefix}_fetched_bytes_total {self.bytes_fetched}")
+        lines.append(f"# TYPE {prefix}_pages_parsed_total counter")
+        for kind, count in sorted(self.pages_parsed.items()):
+            lines.append(f'{prefix}_pages_parsed_total{{kind="{kind}"}} {count}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,63 @@
+import argparse
+import json
+import os
+import sys
+
+from bs4 import BeautifulSoup
+
+from job_records import to_json
+from linkedin_scraper import parse_job_details, parse_job_list
+from lxml_parser import parse_job_details_html, parse_job_list_html
+
+# Checks that the lxml backend reproduces the BeautifulSoup output exactly for
+# every saved page in fixtures/ (job_list*.html and job_details*.html).
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def parse_both(name, html):
+    if name.startswith("job_list"):
+        soup = BeautifulSoup(html, "html.parser")
+        return parse_job_list(soup.find_all("li")), parse_job_list_html(html)
+
+    results = []
+    for parse in (
+        lambda: parse_job_details(BeautifulSoup(html, "html.parser")),
+        lambda: parse_job_details_html(html),
+    ):
+        try:
+            results.append(parse())
+        except AttributeError:
+            # Both backends must reject the same incomplete postings
+            results.append("AttributeError")
+    return results
+
+
+def check_fixtures(fixtures_dir):
+    mismatches = []
+    for name in sorted(os.listdir(fixtures_dir)):
+        if not name.endswith(".html"):
+            continue
+        with open(os.path.join(fixtures_dir, name), encoding="utf-8") as f:
+            expected, actual = parse_both(name, f.read())
+        if expected != actual:
+            mismatches.append((name, expected, actual))
+        print(f"{'ok' if expected == actual else 'MISMATCH'}  {name}")
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--fixtures",
+        type=str,
+        default=FIXTURES_DIR,
+        help="Directory of saved LinkedIn pages",
+    )
+    args = parser.parse_args()
+
+    mismatches = check_fixtures(args.fixtures)
+    for name, expected, actual in mismatches:
+        print(f"\n{name}\nbs4:  {json.dumps(expected, indent=4, default=to_json)}")
+        print(f"lxml: {json.dumps(actual, indent=4, default=to_json)}")
+    sys.exit(1 if mismatches else 0)
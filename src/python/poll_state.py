@@ -0,0 +1,82 @@
+import json
+import sqlite3
+import time
+from array import array
+from bisect import bisect_left
+
+
+def search_key(filters: dict) -> str:
+    """Return a stable key for a saved search from its filters."""
+    return json.dumps(
+        {name: value for name, value in filters.items() if value is not None},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+
+
+class SeenIds:
+    def __init__(self, ids=(), max_size: int = 5000) -> None:
+        """Sorted array of the job ids a saved search has already reported.
+
+        :param ids: numeric LinkedIn job ids
+        :param max_size: ids kept; the smallest (oldest) go first past this size
+        """
+        self.max_size = max_size
+        self.ids = array("Q", sorted({int(job_id) for job_id in ids})[-max_size:])
+
+    @classmethod
+    def from_bytes(cls, data: bytes, max_size: int = 5000) -> "SeenIds":
+        seen = cls(max_size=max_size)
+        seen.ids.frombytes(data)
+        return seen
+
+    def to_bytes(self) -> bytes:
+        return self.ids.tobytes()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, job_id) -> bool:
+        value = int(job_id)
+        indx = bisect_left(self.ids, value)
+        return indx < len(self.ids) and self.ids[indx] == value
+
+    def update(self, job_ids) -> None:
+        merged = set(self.ids)
+        merged.update(int(job_id) for job_id in job_ids)
+        self.ids = array("Q", sorted(merged)[-self.max_size :])
+
+
+class PollState:
+    def __init__(self, path: str, max_seen: int = 5000) -> None:
+        """Seen job ids of each saved search, stored in SQLite.
+
+        :param path: database file, created if missing
+        :param max_seen: ids remembered per saved search
+        """
+        self.max_seen = max_seen
+        self.connection = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS searches ("
+            "key TEXT PRIMARY KEY, seen BLOB NOT NULL, polled_at REAL NOT NULL)"
+        )
+        self.connection.commit()
+
+    def load(self, key: str) -> SeenIds:
+        row = self.connection.execute(
+            "SELECT seen FROM searches WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return SeenIds(max_size=self.max_seen)
+        return SeenIds.from_bytes(row[0], self.max_seen)
+
+    def save(self, key: str, seen: SeenIds) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO searches VALUES (?, ?, ?)",
+                (key, seen.to_bytes(), time.time()),
+            )
+
+    def close(self) -> None:
+        self.connection.close()
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from typing import TYPE_CHECKING
+
+from fp.errors import FreeProxyException
+
+if TYPE_CHECKING:
+    from curl_cffi.requests import AsyncSession
+    from fp.fp import FreeProxy
+
+
+class ProxyStats:
+    __slots__ = ("address", "successes", "failures", "consecutive_failures", "latency")
+
+    def __init__(self, address: str, latency: float) -> None:
+        self.address = address
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latency = latency
+
+    @property
+    def attempts(self) -> int:
+        return self.successes + self.failures
+
+    @property
+    def success_rate(self) -> float:
+        # Laplace smoothing so a freshly validated proxy starts at 0.5
+        return (self.successes + 1) / (self.attempts + 2)
+
+    @property
+    def score(self) -> float:
+        return self.success_rate / max(self.latency, 0.05)
+
+
+class ProxyPool:
+    def __init__(
+        self,
+        free_proxy: FreeProxy,
+        min_size: int = 5,
+        spread: int = 5,
+        refresh_interval: float = 300,
+        validate_url: str = "https://www.google.com",
+        validate_timeout: float = 3,
+        validate_concurrency: int = 20,
+        max_consecutive_failures: int = 3,
+        min_success_rate: float = 0.2,
+        latency_smoothing: float = 0.3,
+        sticky: bool = False,
+    ) -> None:
+        """Keep a validated, health-scored set of proxies from :free_proxy:.
+
+        :param free_proxy: source of candidate proxy lists
+        :param min_size: refresh in the background when fewer healthy proxies remain
+        :param spread: number of top-ranked proxies handed out round-robin
+        :param refresh_interval: seconds between background refreshes
+        :param validate_url: url fetched through each candidate to validate it; https,
+            so a candidate must tunnel TLS the way scraping needs
+        :param validate_timeout: seconds a candidate has to answer validate_url
+        :param validate_concurrency: candidates validated at the same time
+        :param max_consecutive_failures: evict a proxy after this many failures in a row
+        :param min_success_rate: evict a proxy whose smoothed success rate drops below this
+        :param latency_smoothing: weight of the newest sample in the latency average
+        :param sticky: keep handing out the same proxy until it fails, so
+            requests reuse its open connections
+
+        Proxy lists are scraped in an executor and candidates are validated
+        concurrently, so the event loop never blocks on FreeProxy. get() is O(1);
+        the ranking is recomputed whenever a result is reported.
+        """
+        self.free_proxy = free_proxy
+        self.min_size = min_size
+        self.spread = spread
+        self.refresh_interval = refresh_interval
+        self.validate_url = validate_url
+        self.validate_timeout = validate_timeout
+        self.validate_concurrency = validate_concurrency
+        self.max_consecutive_failures = max_consecutive_failures
+        self.min_success_rate = min_success_rate
+        self.latency_smoothing = latency_smoothing
+        self.sticky = sticky
+
+        self.stats: dict[str, ProxyStats] = {}
+        self.ranked: list[str] = []
+        self.cursor = 0
+        self.current: str | None = None
+        self.refreshed_at = 0.0
+        self.refreshing: asyncio.Task | None = None
+        self.maintainer: asyncio.Task | None = None
+        self.wake: asyncio.Event | None = None
+
+    def __len__(self) -> int:
+        return len(self.ranked)
+
+    async def get(self) -> str:
+        """Return the address ("ip:port") of one of the best proxies."""
+        if not self.ranked:
+            await self.refresh()
+            if not self.ranked:
+                raise FreeProxyException("There are no working proxies at this time.")
+        if self.sticky and self.current in self.stats:
+            return self.current
+        address = self.ranked[self.cursor % min(self.spread, len(self.ranked))]
+        self.cursor += 1
+        if self.sticky:
+            self.current = address
+        return address
+
+    def report_success(self, address: str, latency: float) -> None:
+        stats = self.stats.get(address)
+        if stats is None:
+            return
+        stats.successes += 1
+        stats.consecutive_failures = 0
+        stats.latency += self.latency_smoothing * (latency - stats.latency)
+        self.rank()
+
+    def report_failure(self, address: str) -> None:
+        stats = self.stats.get(address)
+        if stats is None:
+            return
+        stats.failures += 1
+        stats.consecutive_failures += 1
+        if address == self.current:
+            # Degraded: move on to the next best proxy
+            self.current = None
+        if (
+            stats.consecutive_failures >= self.max_consecutive_failures
+            or stats.success_rate < self.min_success_rate
+        ):
+            self.evict(address)
+        else:
+            self.rank()
+
+    def evict(self, address: str) -> None:
+        self.stats.pop(address, None)
+        self.rank()
+        if len(self.ranked) < self.min_size and self.wake is not None:
+            self.wake.set()
+
+    def rank(self) -> None:
+        self.ranked = sorted(self.stats, key=lambda a: self.stats[a].score, reverse=True)
+
+    async def refresh(self) -> None:
+        """Fetch and validate a new batch of candidates, deduplicating concurrent calls."""
+        if self.refreshing is None or self.refreshing.done():
+            self.refreshing = asyncio.create_task(self._refresh())
+        await asyncio.shield(self.refreshing)
+
+    async def _refresh(self) -> None:
+        from curl_cffi.requests import AsyncSession
+
+        loop = asyncio.get_running_loop()
+        candidates = await loop.run_in_executor(None, self.fetch_candidates)
+        candidates = [c for c in dict.fromkeys(candidates) if c not in self.stats]
+
+        semaphore = asyncio.Semaphore(self.validate_concurrency)
+
+        async def validate(client: AsyncSession, address: str):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(
+                        self.validate_url,
+                        proxies={"http": address, "https": address},
+                        timeout=self.validate_timeout,
+                    )
+                except Exception:
+                    return address, None
+                if response.status_code != 200:
+                    return address, None
+                return address, time.perf_counter() - start
+
+        async with AsyncSession() as client:
+            results = await asyncio.gather(*(validate(client, c) for c in candidates))
+
+        for address, latency in results:
+            if latency is not None:
+                self.stats[address] = ProxyStats(address, latency)
+        self.refreshed_at = time.monotonic()
+        self.rank()
+
+    def fetch_candidates(self) -> list[str]:
+        candidates = []
+        for repeat in (False, True):
+            try:
+                candidates += self.free_proxy.get_proxy_list(repeat)
+            except FreeProxyException as e:
+                print(e, file=sys.stderr)
+            if len(candidates) >= self.min_size:
+                break
+        return candidates
+
+    def start(self) -> None:
+        """Refresh the pool in the background for as long as the event loop runs."""
+        if self.maintainer is None or self.maintainer.done():
+            self.wake = asyncio.Event()
+            self.maintainer = asyncio.create_task(self.maintain())
+
+    async def stop(self) -> None:
+        if self.maintainer is not None:
+            self.maintainer.cancel()
+            try:
+                await self.maintainer
+            except asyncio.CancelledError:
+                pass
+            self.maintainer = None
+
+    async def maintain(self) -> None:
+        while True:
+            stale = time.monotonic() - self.refreshed_at >= self.refresh_interval
+            if stale or len(self.ranked) < self.min_size:
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    print(f"Proxy refresh failed: {e}", file=sys.stderr)
+            self.wake.clear()
+            try:
+                await asyncio.wait_for(self.wake.wait(), timeout=self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
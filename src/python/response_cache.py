@@ -0,0 +1,161 @@
+import asyncio
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+def normalize_url(url: str) -> str:
+    """Return a cache key for :url: that ignores parameter order, case and padding."""
+    parts = urlsplit(url)
+    query = sorted(
+        (key, " ".join(value.lower().split()))
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+    )
+    return urlunsplit(
+        (
+            parts.scheme.lower(),
+            parts.netloc.lower(),
+            parts.path.rstrip("/"),
+            urlencode(query),
+            "",
+        )
+    )
+
+
+class MemoryCache:
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+    def get(self, key: str) -> tuple[str, float] | None:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, value: str, stored_at: float) -> None:
+        self.entries[key] = (value, stored_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self.entries.pop(key, None)
+
+
+class SqliteCache:
+    def __init__(self, path: str, max_entries: int) -> None:
+        """LRU cache stored in SQLite so several worker processes can share it.
+
+        :param path: database file, created if missing
+        :param max_entries: least recently used entries are deleted past this size
+        """
+        self.max_entries = max_entries
+        self.connection = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)"
+        )
+        self.connection.commit()
+
+    def get(self, key: str) -> tuple[str, float] | None:
+        with self.connection:
+            entry = self.connection.execute(
+                "SELECT value, stored_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if entry is not None:
+                self.connection.execute(
+                    "UPDATE cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+                )
+        return entry
+
+    def set(self, key: str, value: str, stored_at: float) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                (key, value, stored_at, stored_at),
+            )
+            (size,) = self.connection.execute("SELECT COUNT(*) FROM cache").fetchone()
+            if size > self.max_entries:
+                self.connection.execute(
+                    "DELETE FROM cache WHERE key IN "
+                    "(SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                    (size - self.max_entries,),
+                )
+
+    def delete(self, key: str) -> None:
+        with self.connection:
+            self.connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        backend: MemoryCache | SqliteCache,
+        ttl: float = 3600,
+        stale_ttl: float = 3600,
+    ) -> None:
+        """Serve cached response bodies with stale-while-revalidate.
+
+        :param backend: MemoryCache or SqliteCache holding (body, stored_at) by key
+        :param ttl: seconds an entry is served as fresh
+        :param stale_ttl: seconds past ttl an entry is still served while it is
+            refreshed in the background
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.revalidating: dict[str, asyncio.Task] = {}
+
+    async def fetch(self, key: str, fetch) -> str | None:
+        """Return the body cached under :key:, calling :fetch: when it is missing.
+
+        :param key: cache key, usually normalize_url(url)
+        :param fetch: coroutine function returning the body, or None on failure
+        """
+        entry = self.backend.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age < self.ttl:
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self.revalidate(key, fetch)
+                return value
+            self.backend.delete(key)
+
+        value = await fetch()
+        if value is not None:
+            self.backend.set(key, value, time.time())
+        return value
+
+    def revalidate(self, key: str, fetch) -> None:
+        if key in self.revalidating:
+            return
+
+        async def refresh():
+            try:
+                value = await fetch()
+                if value is not None:
+                    self.backend.set(key, value, time.time())
+            except Exception as e:
+                print(f"Cache revalidation failed for {key}: {e}", file=sys.stderr)
+            finally:
+                self.revalidating.pop(key, None)
+
+        self.revalidating[key] = asyncio.create_task(refresh())
+
+    async def drain(self) -> None:
+        """Wait for the background refreshes still running."""
+        while self.revalidating:
+            await asyncio.gather(*self.revalidating.values(), return_exceptions=True)
@@ -0,0 +1,121 @@
+import random
+import time
+
+# Outcomes of a single fetch attempt
+SUCCESS = "success"
+NOT_FOUND = "not_found"
+CLIENT_ERROR = "client_error"
+BLOCKED = "blocked"
+THROTTLED = "throttled"
+SERVER_ERROR = "server_error"
+CONNECTION_ERROR = "connection_error"
+
+
+def classify(status_code: int | None) -> str:
+    """Map a response status (None for a raised request) to an outcome."""
+    if status_code is None:
+        return CONNECTION_ERROR
+    if status_code == 200:
+        return SUCCESS
+    if status_code in (404, 410):
+        return NOT_FOUND
+    # 999 is LinkedIn's "request denied" status for suspected scrapers
+    if status_code in (429, 999):
+        return THROTTLED
+    if status_code == 403:
+        return BLOCKED
+    if 400 <= status_code < 500:
+        return CLIENT_ERROR
+    return SERVER_ERROR
+
+
+class Decision:
+    __slots__ = ("retry", "delay", "rotate_proxy")
+
+    def __init__(self, retry: bool, delay: float = 0, rotate_proxy: bool = False):
+        self.retry = retry
+        self.delay = delay
+        self.rotate_proxy = rotate_proxy
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts: int = 20,
+        base_delay: float = 0.5,
+        max_delay: float = 30,
+    ) -> None:
+        """Decide whether and how to retry a failed fetch.
+
+        :param max_attempts: attempts per request before giving up
+        :param base_delay: backoff in seconds after the first throttled attempt
+        :param max_delay: cap on a single backoff
+
+        Missing postings and other client errors fail fast. Throttling and
+        server errors back off exponentially with full jitter. Connection errors
+        and blocks retry at once on a different proxy.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def decide(self, outcome: str, attempt: int) -> Decision:
+        """:param attempt: number of attempts made so far, including this one"""
+        if outcome in (SUCCESS, NOT_FOUND, CLIENT_ERROR) or attempt >= self.max_attempts:
+            return Decision(False)
+        if outcome == THROTTLED:
+            return Decision(True, self.backoff(attempt), rotate_proxy=True)
+        if outcome == SERVER_ERROR:
+            return Decision(True, self.backoff(attempt))
+        return Decision(True, rotate_proxy=True)
+
+
+class Circuit:
+    __slots__ = ("throttled", "opened_at", "probing")
+
+    def __init__(self) -> None:
+        self.throttled = 0
+        self.opened_at: float | None = None
+        self.probing = False
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int = 20, recovery_time: float = 30) -> None:
+        """Stop sending requests to a host that keeps throttling us.
+
+        :param threshold: consecutive throttled responses that open a host's circuit
+        :param recovery_time: seconds an open circuit rejects requests before a
+            single probe request is let through
+        """
+        self.threshold = threshold
+        self.recovery_time = recovery_time
+        self.circuits: dict[str, Circuit] = {}
+
+    def allow(self, host: str) -> bool:
+        circuit = self.circuits.get(host)
+        if circuit is None or circuit.opened_at is None:
+            return True
+        now = time.monotonic()
+        if now - circuit.opened_at < self.recovery_time:
+            return False
+        # Half-open: restarting the clock lets exactly one probe through per
+        # recovery_time, even if a probe never reports back
+        circuit.opened_at = now
+        circuit.probing = True
+        return True
+
+    def record(self, host: str, outcome: str) -> None:
+        circuit = self.circuits.setdefault(host, Circuit())
+        if outcome == THROTTLED:
+            circuit.throttled += 1
+            if circuit.probing or circuit.throttled >= self.threshold:
+                circuit.opened_at = time.monotonic()
+                circuit.probing = False
+        elif outcome in (SUCCESS, NOT_FOUND, CLIENT_ERROR):
+            # The host answered normally
+            circuit.throttled = 0
+            circuit.opened_at = None
+            circuit.probing = False
@@ -0,0 +1,112 @@
+import html as html_lib
+
+# Kept by description_html, without attributes except a link's href; other
+# tags are unwrapped to their content
+ALLOWED_TAGS = frozenset(
+    ("p", "br", "ul", "ol", "li", "strong", "b", "em", "i", "u", "h1", "h2", "h3", "h4", "a")
+)
+# Dropped together with their content
+DROPPED_TAGS = frozenset(("script", "style", "button", "icon", "svg", "template"))
+# Start a new line in description_text
+BLOCK_TAGS = frozenset(
+    ("p", "div", "br", "ul", "ol", "li", "h1", "h2", "h3", "h4", "h5", "h6", "section", "tr")
+)
+
+
+def _fragment(html):
+    if not html or html == "None":
+        return None
+    import lxml.html
+    from lxml import etree
+
+    try:
+        return lxml.html.fragment_fromstring(html, create_parent=True)
+    except etree.ParserError:
+        return None
+
+
+def _tag(elem):
+    # Comments and processing instructions have a non-string tag
+    return elem.tag if isinstance(elem.tag, str) else None
+
+
+def description_text(html):
+    """Return a job description as plain text, one line per paragraph or list item."""
+    root = _fragment(html)
+    if root is None:
+        return None
+    lines = []
+    line = []
+
+    def flush():
+        text = " ".join("".join(line).split())
+        if text:
+            lines.append(text)
+        line.clear()
+
+    def walk(elem):
+        tag = _tag(elem)
+        if tag is not None and tag not in DROPPED_TAGS:
+            block = tag in BLOCK_TAGS
+            if block:
+                flush()
+            if tag == "li":
+                line.append("- ")
+            line.append(elem.text or "")
+            for child in elem:
+                walk(child)
+            if block:
+                flush()
+        line.append(elem.tail or "")
+
+    walk(root)
+    flush()
+    return "\n".join(lines)
+
+
+def description_html(html):
+    """Return a job description reduced to basic formatting tags, whitespace collapsed."""
+    root = _fragment(html)
+    if root is None:
+        return None
+    parts = []
+
+    def text(value):
+        return html_lib.escape(value, quote=False) if value else ""
+
+    def walk(elem):
+        tag = _tag(elem)
+        if tag is not None and tag not in DROPPED_TAGS:
+            keep = tag in ALLOWED_TAGS
+            if keep and tag == "a":
+                href = elem.get("href") or ""
+                if href.startswith(("http://", "https://")):
+                    parts.append(f'<a href="{html_lib.escape(href)}">')
+                else:
+                    keep = False
+            elif keep:
+                parts.append(f"<{tag}>")
+            parts.append(text(elem.text))
+            for child in elem:
+                walk(child)
+            if keep and tag != "br":
+                parts.append(f"</{tag}>")
+        parts.append(text(elem.tail))
+
+    parts.append(text(root.text))
+    for child in root:
+        walk(child)
+    return " ".join("".join(parts).split())
+
+
+FORMATS = {"clean": description_html, "text": description_text}
+
+
+def format_description(html, format="html"):
+    """Return a scraped description in :format:.
+
+    :param format: "html" as scraped, "clean" for basic formatting tags only, or
+        "text" for plain text
+    """
+    sanitize = FORMATS.get(format)
+    return html if sanitize is None else sanitize(html)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from curl_cffi.requests import AsyncSession
+
+
+class SessionPool:
+    def __init__(self, max_sessions: int = 32, max_clients: int = 10, **session_kwargs) -> None:
+        """Keep-alive sessions keyed by (proxy, impersonation target).
+
+        :param max_sessions: sessions kept open; past this the least recently
+            used idle one is closed
+        :param max_clients: concurrent requests per session
+        :param session_kwargs: passed to every AsyncSession
+
+        Stands in for an AsyncSession as the scraper's client. Requests through
+        the same proxy with the same TLS fingerprint share a session, so they
+        reuse its open connections instead of paying a new TCP and TLS handshake
+        through the proxy each time. HTTP/2 is negotiated wherever the target
+        offers it, so concurrent requests to one host multiplex over a single
+        connection.
+        """
+        self.max_sessions = max_sessions
+        self.max_clients = max_clients
+        self.session_kwargs = session_kwargs
+        self.sessions: OrderedDict[tuple, AsyncSession] = OrderedDict()
+        self.active: dict[tuple, int] = {}
+        self.closing: set[asyncio.Task] = set()
+        self.created = 0
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def session(self, key: tuple) -> AsyncSession:
+        session = self.sessions.get(key)
+        if session is None:
+            # curl_cffi loads on the first request rather than at import
+            from curl_cffi.requests import AsyncSession
+
+            session = AsyncSession(max_clients=self.max_clients, **self.session_kwargs)
+            self.sessions[key] = session
+            self.created += 1
+        self.sessions.move_to_end(key)
+        self._evict(key)
+        return session
+
+    def _evict(self, keep: tuple) -> None:
+        # Oldest first; a session with requests in flight, or the one just
+        # asked for, is never closed. The pool may run over max_sessions
+        # until one frees up.
+        for key in list(self.sessions):
+            if len(self.sessions) <= self.max_sessions:
+                break
+            if key == keep or self.active.get(key):
+                continue
+            task = asyncio.create_task(self.sessions.pop(key).close())
+            self.closing.add(task)
+            task.add_done_callback(self.closing.discard)
+
+    async def get(self, url, impersonate=None, proxies=None, **kwargs):
+        key = (tuple(sorted((proxies or {}).items())), impersonate)
+        self.active[key] = self.active.get(key, 0) + 1
+        try:
+            session = self.session(key)
+            return await session.get(url, impersonate=impersonate, proxies=proxies, **kwargs)
+        finally:
+            self.active[key] -= 1
+            if not self.active[key]:
+                del self.active[key]
+
+    async def close(self) -> None:
+        sessions = list(self.sessions.values())
+        self.sessions.clear()
+        await asyncio.gather(*(session.close() for session in sessions), *self.closing)
+
+    async def __aenter__(self) -> "SessionPool":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
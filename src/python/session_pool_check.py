@@ -0,0 +1,80 @@
+import asyncio
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+from session_pool import SessionPool
+
+# Regression checks for SessionPool eviction. Run after touching
+# session_pool.py; exits non-zero on any mismatch. Requests go to a local
+# server posing as a proxy, one proxy user per session key.
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        # Long enough for every request of a batch to be in flight at once
+        time.sleep(0.2)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+async def fetch_all(pool, proxy, users):
+    responses = await asyncio.gather(
+        *(
+            pool.get("http://example.invalid/", proxies={"http": proxy % user})
+            for user in users
+        ),
+        return_exceptions=True,
+    )
+    return [
+        r.status_code if hasattr(r, "status_code") else f"{type(r).__name__}: {r}"
+        for r in responses
+    ]
+
+
+def users(pool):
+    return [dict(proxies)["http"].split("//")[1].split("@")[0] for proxies, _ in pool.sessions]
+
+
+async def check(proxy):
+    failures = 0
+
+    def expect(label, actual, expected):
+        nonlocal failures
+        ok = actual == expected
+        failures += not ok
+        print(f"{'ok' if ok else 'MISMATCH'}  {label}: {actual!r}")
+
+    async with SessionPool(max_sessions=2) as pool:
+        # More sessions busy at once than the pool keeps: it runs over its
+        # size rather than closing the one just created
+        expect("all busy", await fetch_all(pool, proxy, ["c0", "c1", "c2"]), [200] * 3)
+        expect("all busy, sessions kept", users(pool), ["c0", "c1", "c2"])
+
+        expect("next request", await fetch_all(pool, proxy, ["c3"]), [200])
+        expect("idle ones evicted oldest first", users(pool), ["c2", "c3"])
+
+        await fetch_all(pool, proxy, ["c2"])
+        await fetch_all(pool, proxy, ["c4"])
+        expect("recently used kept", users(pool), ["c2", "c4"])
+    return failures
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, daemon=True).start()
+    proxy = f"http://%s@127.0.0.1:{server.server_address[1]}"
+    try:
+        failures = asyncio.run(check(proxy))
+    finally:
+        server.shutdown()
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterable, Iterator
+
+# Whitespace before these is dropped when normalizing, so "Node.js , React"
+# and "Node.js, React" compare equal
+PUNCTUATION = ".,!?;:-"
+
+
+def normalize_with_offsets(text: str) -> tuple[str, list[int]]:
+    """Collapse whitespace in :text: and remember where each character came from.
+
+    :param text: raw document or pattern text
+    :return: the normalized text and, for each of its characters, the index of
+        the character in :text: it was taken from
+    """
+    chars: list[str] = []
+    offsets: list[int] = []
+    i, n = 0, len(text)
+    while i < n:
+        if text[i].isspace():
+            j = i
+            while j < n and text[j].isspace():
+                j += 1
+            if chars and j < n and text[j] not in PUNCTUATION:
+                chars.append(" ")
+                offsets.append(i)
+            i = j
+            continue
+        chars.append(text[i])
+        offsets.append(i)
+        i += 1
+    return "".join(chars), offsets
+
+
+def normalize(text: str) -> str:
+    return normalize_with_offsets(text)[0]
+
+
+def normalize_pattern(text: str) -> str:
+    """Normalize a search string; a trailing full stop is optional when matching."""
+    return normalize(text).rstrip(".")
+
+
+class Automaton:
+    def __init__(self, patterns: Iterable[str]) -> None:
+        """Aho-Corasick automaton finding all :patterns: in one pass over a text.
+
+        :param patterns: strings to search for; empty strings never match
+        """
+        self.patterns = list(patterns)
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        # pattern index ending at each node, and the nearest node along the
+        # fail chain that ends a pattern
+        self.output: list[int] = [-1]
+        self.dict_link: list[int] = [-1]
+
+        for index, pattern in enumerate(self.patterns):
+            if pattern:
+                self._add(pattern, index)
+        self._link()
+
+    def _add(self, pattern: str, index: int) -> None:
+        node = 0
+        for char in pattern:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][char] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(-1)
+                self.dict_link.append(-1)
+            node = next_node
+        if self.output[node] == -1:
+            self.output[node] = index
+
+    def _link(self) -> None:
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                if self.fail[child] == child:
+                    self.fail[child] = 0
+                target = self.fail[child]
+                self.dict_link[child] = (
+                    target if self.output[target] != -1 else self.dict_link[target]
+                )
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int, int]]:
+        """Yield (start, end, pattern index) for every occurrence, by end offset."""
+        goto, fail, output, dict_link = self.goto, self.fail, self.output, self.dict_link
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            match = node if output[node] != -1 else dict_link[node]
+            while match != -1:
+                index = output[match]
+                yield end - len(self.patterns[index]), end, index
+                match = dict_link[match]
+
+    def find_all(self, text: str) -> list[tuple[int, int, int]]:
+        """Return non-overlapping whole-word occurrences, leftmost first, longest on ties.
+
+        An occurrence is skipped when a pattern that starts (or ends) with a
+        letter or digit is glued to one in the text, so "Java" is not found in
+        "JavaScript".
+        """
+        matches = sorted(
+            (m for m in self.iter_matches(text) if self._is_whole_word(text, *m)),
+            key=lambda m: (m[0], m[0] - m[1]),
+        )
+        selected = []
+        last_end = 0
+        for start, end, index in matches:
+            if start >= last_end:
+                selected.append((start, end, index))
+                last_end = end
+        return selected
+
+    def _is_whole_word(self, text: str, start: int, end: int, index: int) -> bool:
+        pattern = self.patterns[index]
+        if start > 0 and pattern[0].isalnum() and text[start - 1].isalnum():
+            return False
+        if end < len(text) and pattern[-1].isalnum() and text[end].isalnum():
+            return False
+        return True
@@ -0,0 +1,70 @@
+import sys
+
+from lxml import etree
+
+from docx_replace import W_NS, Replacer, TemplatePart
+from text_matcher import Automaton
+
+# Regression checks for the replacement matcher. Run after touching
+# text_matcher.py or Replacer; exits non-zero on any mismatch.
+
+# (patterns, text, expected [(start, end, pattern index)])
+FIND_ALL_CASES = [
+    (["Java"], "Skilled in JavaScript", []),
+    (["Java"], "Javascript | Kotlin | Java", [(22, 26, 0)]),
+    (["Java"], "Java, Kotlin", [(0, 4, 0)]),
+    (["Node.js"], "Node.js/React", [(0, 7, 0)]),
+    # A pattern edge that is not alphanumeric may touch anything
+    ([".NET"], "ASP.NET Core", [(3, 7, 0)]),
+    (["Java", "JavaScript"], "JavaScript and Java", [(0, 10, 1), (15, 19, 0)]),
+]
+
+# (replacements, paragraph text, expected paragraph text)
+REPLACE_CASES = [
+    ([("Java", "Go")], "Skilled in JavaScript", "Skilled in JavaScript"),
+    ([("Java", "Go")], "Javascript | Kotlin | Java", "Javascript | Kotlin | Go"),
+    ([("Java.", "Go.")], "I write Java.", "I write Go."),
+]
+
+# (replacements, paragraph text, whether a compiled part is rewritten); a part
+# with only substring hits inside longer words is left as it is
+RENDER_CASES = [
+    ([("Kotl", "Go")], "Kotlin", False),
+    ([("Kotlin", "Go")], "Kotlin", True),
+]
+
+
+def paragraph_xml(text):
+    return etree.fromstring(
+        f'<w:document xmlns:w="{W_NS}"><w:body><w:p><w:r><w:t xml:space="preserve">'
+        f"{text}</w:t></w:r></w:p></w:body></w:document>"
+    )
+
+
+def check():
+    failures = 0
+    for patterns, text, expected in FIND_ALL_CASES:
+        actual = Automaton(patterns).find_all(text)
+        ok = actual == expected
+        failures += not ok
+        print(f"{'ok' if ok else 'MISMATCH'}  find_all {patterns} in {text!r}: {actual}")
+
+    for replacements, text, expected in REPLACE_CASES:
+        root = paragraph_xml(text)
+        Replacer(*replacements).replace_text(root)
+        actual = "".join(root.itertext())
+        ok = actual == expected
+        failures += not ok
+        print(f"{'ok' if ok else 'MISMATCH'}  replace {replacements} in {text!r}: {actual!r}")
+
+    for replacements, text, expected in RENDER_CASES:
+        part = TemplatePart(etree.tostring(paragraph_xml(text)))
+        actual = part.render(Replacer(*replacements), "word/document.xml") is not None
+        ok = actual == expected
+        failures += not ok
+        print(f"{'ok' if ok else 'MISMATCH'}  render {replacements} in {text!r}: {actual}")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if check() else 0)